@@ -6,15 +6,15 @@ from .deck import Deck
 
 
 class Board:
-    def __init__(self):
+    def __init__(self, rng: np.random.Generator | None = None):
         # Gems - [white, blue, green, red, black, gold]
         self.gems = np.array([4, 4, 4, 4, 4, 5], dtype=int)
 
         # Decks
-        self.tier1 = Deck(0)
-        self.tier2 = Deck(1)
-        self.tier3 = Deck(2)
-        self.noble = Deck('Noble')
+        self.tier1 = Deck(0, rng)
+        self.tier2 = Deck(1, rng)
+        self.tier3 = Deck(2, rng)
+        self.noble = Deck('Noble', rng)
 
         self.decks = [
             self.tier1, 
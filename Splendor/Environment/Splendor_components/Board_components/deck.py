@@ -6,19 +6,47 @@ from random import SystemRandom
 from .splendor_cards_data import PRELOADED_CARD_DATA
 
 
+def _build_card_table():
+    """Global per-id arrays for every card and noble.  Row 0 is
+    unused so that the row index is the card id (1-100).
+    """
+    rows = [(tier, row) for tier in (0, 1, 2, 'Noble')
+            for row in PRELOADED_CARD_DATA[tier]]
+    n_rows = max(row["id"] for _, row in rows) + 1
+
+    costs = np.zeros((n_rows, 6), dtype=int)
+    gems = np.zeros(n_rows, dtype=int)
+    points = np.zeros(n_rows, dtype=int)
+    tiers = np.full(n_rows, -1, dtype=int)  # -1 for nobles
+    for tier, row in rows:
+        costs[row["id"], :5] = row["cost"]
+        gems[row["id"]] = row["gem"]
+        points[row["id"]] = row["points"]
+        if tier != 'Noble':
+            tiers[row["id"]] = tier
+
+    for table in (costs, gems, points, tiers):
+        table.flags.writeable = False
+    return costs, gems, points, tiers
+
+CARD_COSTS, CARD_GEMS, CARD_POINTS, CARD_TIERS = _build_card_table()
+GEM_ONE_HOT = np.eye(5, dtype=int)
+GEM_ONE_HOT.flags.writeable = False
+
+
 class Card:
-    def __init__(self, id, tier, gem, points, cost):
+    """Flyweight; cost and gem_one_hot are read-only views
+    into the global card table rather than owned arrays.
+    """
+    __slots__ = ("id", "tier", "gem", "points", "cost", "gem_one_hot")
+
+    def __init__(self, id, tier, gem, points):
         self.id: int = id
         self.tier: int = tier
         self.gem: int = gem
-        self.gem_one_hot: np.ndarray = self.gem_to_one_hot(gem)
-        self.points: float = points
-        self.cost: np.ndarray = np.concatenate((cost, [0]))  # gem costs
-
-    def gem_to_one_hot(self, index):
-        one_hot = np.zeros(5, dtype=int)
-        one_hot[index] = 1
-        return one_hot
+        self.points: int = points
+        self.cost: np.ndarray = CARD_COSTS[id]  # gem costs
+        self.gem_one_hot: np.ndarray = GEM_ONE_HOT[gem]
 
     def to_vector(self, effective_gems):
         # Subtracting helps the model learn how far it is from buying
@@ -27,10 +55,13 @@ class Card:
     
 
 class Noble:
-    def __init__(self, id, tier, gem, points, cost):
+    """Flyweight; cost is a read-only view into the card table."""
+    __slots__ = ("id", "points", "cost")
+
+    def __init__(self, id, points):
         self.id: int = id
         self.points: int = points  # always 3
-        self.cost: np.ndarray = np.concatenate((cost, [0]))  # visit gem requirement
+        self.cost: np.ndarray = CARD_COSTS[id]  # visit gem requirement
     
     def to_vector(self, effective_gems) -> np.ndarray:
         # Subtracting helps the model learn how far it is from the Noble
@@ -40,19 +71,17 @@ class Noble:
 
 _PRELOADED_DECKS = None
 def _preload_decks():
-    # Read each tier's sheet into memory
+    # One shared flyweight per card, reused by every Deck
     preloaded_decks = {}
     for tier in [0, 1, 2]:
         cards = [
-            Card(id=row["id"], tier=tier, gem=row["gem"],
-                points=row["points"], cost=row["cost"])
+            Card(id=row["id"], tier=tier, gem=row["gem"], points=row["points"])
             for row in PRELOADED_CARD_DATA[tier]
         ]
         preloaded_decks[tier] = cards
     
     preloaded_decks['Noble'] = [
-        Noble(id=row["id"], tier=tier, gem=row["gem"],
-              points=row["points"], cost=row["cost"])
+        Noble(id=row["id"], points=row["points"])
         for row in PRELOADED_CARD_DATA['Noble']
     ]
 
@@ -60,7 +89,10 @@ def _preload_decks():
 
 
 class Deck:
-    def __init__(self, tier):
+    def __init__(self, tier, rng: np.random.Generator | None = None):
+        """Shuffled with rng when given, for games that replay from a
+        seed, and with SystemRandom otherwise.
+        """
         global _PRELOADED_DECKS
         if _PRELOADED_DECKS is None:
             _PRELOADED_DECKS = _preload_decks()
@@ -68,7 +100,10 @@ class Deck:
         self.tier = tier
 
         self.cards = list(_PRELOADED_DECKS[self.tier])
-        SystemRandom().shuffle(self.cards)
+        if rng is None:
+            SystemRandom().shuffle(self.cards)
+        else:
+            self.cards = [self.cards[i] for i in rng.permutation(len(self.cards))]
 
     def draw(self):
         return self.cards.pop() if self.cards else None
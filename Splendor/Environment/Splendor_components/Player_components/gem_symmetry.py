@@ -0,0 +1,69 @@
+# Splendor/Environment/Splendor_components/Player_components/gem_symmetry.py
+"""Gem-color symmetry for the gem-take subproblem.
+
+Cards tell the five colors apart, but taking gems only sees the board
+supply: relabeling its colors relabels the legal takes the same way.
+Tables over the supply only need one canonical representative per
+orbit of the 120 color permutations.  Gold (index 5) is never
+permuted.
+
+Canonical form sorts the colors by board count, descending, and
+canonical color i is original color perm[i].
+"""
+
+import itertools as it
+
+import numpy as np
+from numpy import ndarray
+
+
+PERMUTATIONS = np.array(list(it.permutations(range(5))))  # (120, 5)
+
+# Base-5 code of each permutation -> its row in PERMUTATIONS
+_PERM_INDEX = np.full(5**5, -1, dtype=int)
+_PERM_INDEX[PERMUTATIONS @ 5**np.arange(5)] = np.arange(len(PERMUTATIONS))
+
+
+def perm_index(perm: ndarray) -> ndarray:
+    """Row of each (..., 5) permutation in PERMUTATIONS."""
+    return _PERM_INDEX[perm @ 5**np.arange(5)]
+
+
+def canonicalize(board_gems: ndarray) -> tuple[ndarray, ndarray]:
+    """Canonical board for one supply or a batch of them.
+    Returns (board, perm).
+    """
+    board = np.asarray(board_gems)
+    perm = np.argsort(-board[..., :5], axis=-1, kind="stable")
+    full = np.concatenate([perm, np.full(perm.shape[:-1] + (1,), 5)], axis=-1)
+    return np.take_along_axis(board, full, axis=-1), perm
+
+
+def canonical_boards() -> ndarray:
+    """The 126 canonical 5-color board supplies (0-4 per color)."""
+    boards = [
+        combo[::-1]
+        for combo in it.combinations_with_replacement(range(5), 5)
+    ]
+    return np.array(boards)
+
+
+def board_codes(boards: ndarray) -> ndarray:
+    """Base-5 code of (..., 5) board supplies, for table lookups."""
+    return np.minimum(boards[..., :5], 4) @ 5**np.arange(5)
+
+
+def relabel_moves(move_gems: ndarray) -> ndarray:
+    """(120, M) map from each move to the move taking the same gems
+    with colors relabeled: row p sends a move taking colors S to the
+    one taking PERMUTATIONS[p][S].  move_gems is (M, 6), one gem
+    vector per move (at most 2 of a color); rows that repeat (discard
+    variants) are contiguous and map in order.
+    """
+    codes = move_gems[:, :5] @ 3**np.arange(5)
+    first = np.full(3**5, len(codes), dtype=int)
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    variant = np.arange(len(codes)) - first[codes]
+
+    relabeled = move_gems[:, :5] @ (3**PERMUTATIONS).T  # (M, 120)
+    return (first[relabeled] + variant[:, None]).T
@@ -4,7 +4,11 @@ from __future__ import annotations
 import numpy as np
 from numpy import ndarray
 import itertools as it
-from typing import TYPE_CHECKING
+from typing import NamedTuple, TYPE_CHECKING
+
+from .gem_symmetry import (
+    canonicalize, canonical_boards, board_codes, perm_index, relabel_moves
+)
 
 if TYPE_CHECKING:
     from .human_agent import HumanAgent
@@ -12,19 +16,113 @@ if TYPE_CHECKING:
     from Splendor.Play.common_types import GUIMove
 
 
+def sample_discards(gems: ndarray, taken: ndarray, n_discards, rng=np.random) -> ndarray:
+    """Draws the full discard vector for one hand or a batch of hands.
+
+    Each discard picks uniformly among the colors still held,
+    preferring colors that weren't just taken and falling back
+    to any held color.  Gold is never discarded.  At most 3
+    discards can be owed, so this is a fixed number of rounds
+    vectorized over the batch rather than a loop per gem.
+
+    gems: (..., 6) hands AFTER the take was added.
+    taken: (..., 6) gems that were taken this move.
+    n_discards: int or (...,) number of discards owed.
+    """
+    gems = np.asarray(gems)
+    held = gems[..., :5].copy()
+    fresh = np.asarray(taken)[..., :5] == 0
+    owed = np.broadcast_to(n_discards, held.shape[:-1])
+    discards = np.zeros(gems.shape, dtype=int)
+
+    for round_idx in range(int(np.max(owed, initial=0))):
+        active = owed > round_idx
+        candidates = held > 0
+        preferred = candidates & fresh
+        has_pref = preferred.any(axis=-1, keepdims=True)
+        candidates = np.where(has_pref, preferred, candidates)
+
+        # Uniform pick among candidate colors: argmax of masked noise
+        noise = rng.random(held.shape)
+        noise[~candidates] = -1.0
+        color = np.argmax(noise, axis=-1)
+
+        picked = (np.arange(5) == color[..., None]) & active[..., None]
+        held -= picked
+        discards[..., :5] += picked
+
+    return discards
+
+
+class Affordability(NamedTuple):
+    """Per-card purchase info, leading dims match the cost stack."""
+    afford_wo_gold: ndarray    # (..., K) bool
+    afford_with_gold: ndarray  # (..., K) bool
+    gold_needed: ndarray       # (..., K) int
+    gold_choice: ndarray       # (..., K) bool, gold could optionally be spent
+    spend: ndarray             # (..., K, 6) auto-spend, gold last
+
+
+def affordability(costs: ndarray, gems: ndarray, cards: ndarray) -> Affordability:
+    """Deficit math for a whole stack of cards in one broadcast.
+    costs is (..., K, 6) and gems/cards are (..., 6), so this
+    works for one player's 15 candidates or a batch of players.
+    """
+    gems = gems[..., None, :]
+    discounted = np.maximum(costs - cards[..., None, :], 0)
+
+    # Pay what we can with regular gems, gold covers the rest
+    spend = np.minimum(gems, discounted)
+    colored_cost = discounted[..., :5].sum(axis=-1)
+    gold_needed = colored_cost - spend[..., :5].sum(axis=-1)
+    gold = gems[..., 5]
+
+    afford_wo_gold = gold_needed == 0
+    afford_with_gold = gold_needed <= gold
+
+    # Gold choice exists if we have gold beyond what's required
+    gold_choice = (colored_cost > 0) & np.where(
+        afford_wo_gold, gold > 0, gold > gold_needed
+    )
+
+    spend[..., 5] = np.minimum(gold_needed, gold)
+    return Affordability(
+        afford_wo_gold, afford_with_gold, gold_needed, gold_choice, spend
+    )
+
+
 class Player:
+    __slots__ = (
+        "name", "agent", "pos",
+        "gems", "cards", "reserved_cards", "hidden_reserves",
+        "card_ids", "noble_ids", "points", "victor",
+        "effective_gems", "gem_total", "card_total",
+    )
+
+    # Move tables shared by every player, filled in below the class
+    all_takes_3: ndarray
+    all_takes_2_diff: ndarray
+    all_takes_2_same: ndarray
+    all_takes_1: ndarray
+    take_table: ndarray        # (canonical board, gem total) -> take mask
+    take_board_rows: ndarray   # board code -> row of take_table
+    take_relabel: ndarray      # (color permutation, move) -> canonical move
+    take_dim: int
+    buy_dim: int
+    reserve_dim: int
+    action_dim: int
+
     def __init__(self, name: str, agent: InferenceModel | HumanAgent, pos: int):
         self.name = name
         self.agent = agent
         self.pos = pos
         self.reset()
-        self._initialize_all_takes()
-        self._initialize_dimensions()
     
     def reset(self):
         self.gems: ndarray = np.zeros(6, dtype=int)  # Gold gem so 6
         self.cards: ndarray = np.zeros(6, dtype=int)  # Last dim unused but matches 6
         self.reserved_cards: list = []
+        self.hidden_reserves: set = set()  # ids reserved blind from a deck
 
         # Attributes for upstream
         self.card_ids: list = [[] for _ in range(5)]
@@ -32,54 +130,109 @@ class Player:
         self.points: float = 0.0
         self.victor: bool = False
 
-    @property
-    def effective_gems(self) -> ndarray:
-        return self.gems + self.cards
+        # Cached aggregates, see _refresh_aggregates
+        self.effective_gems: ndarray = np.zeros(6, dtype=int)
+        self.gem_total: int = 0
+        self.card_total: int = 0
 
-    def _initialize_all_takes(self) -> None:
+    def _refresh_aggregates(self) -> None:
+        """Recompute derived arrays in place.  Every method that
+        mutates gems or cards must call this before returning.
+        """
+        np.add(self.gems, self.cards, out=self.effective_gems)
+        self.gem_total = int(self.gems.sum())
+        self.card_total = int(self.cards.sum())
+
+    def adjust_gems(self, delta: ndarray) -> None:
+        """Direct gem edits (GUI moves) that bypass auto_take/auto_spend."""
+        self.gems += delta
+        self._refresh_aggregates()
+
+    @classmethod
+    def _initialize_all_takes(cls) -> None:
         """Preloads all possible take indices."""
         # Take 3
         indices = list(it.combinations(range(5), 3))
         all_takes = np.zeros((10, 6), dtype=int)
         for index, combo in enumerate(indices):
             all_takes[index, combo] = 1
-        self.all_takes_3 = all_takes
+        cls.all_takes_3 = all_takes
 
         # Take 2 (different)
         indices = list(it.combinations(range(5), 2))
         all_takes = np.zeros((10, 6), dtype=int)
         for index, combo in enumerate(indices):
             all_takes[index, combo] = 1
-        self.all_takes_2_diff = all_takes
+        cls.all_takes_2_diff = all_takes
         
         # Take 2 (same)
-        self.all_takes_2_same = np.zeros((5, 6), dtype=int)
-        self.all_takes_2_same[np.arange(5), np.arange(5)] = 2
+        cls.all_takes_2_same = np.zeros((5, 6), dtype=int)
+        cls.all_takes_2_same[np.arange(5), np.arange(5)] = 2
 
         # Take 1
-        self.all_takes_1 = np.zeros((5, 6), dtype=int)
-        self.all_takes_1[np.arange(5), np.arange(5)] = 1
+        cls.all_takes_1 = np.zeros((5, 6), dtype=int)
+        cls.all_takes_1[np.arange(5), np.arange(5)] = 1
 
-    def _initialize_dimensions(self) -> None:
+    @classmethod
+    def _initialize_dimensions(cls) -> None:
         """Preload regularly used dim vars."""
-        self.take_dim = (
-            len(self.all_takes_3) * 4 +       # 10 * 4
-            len(self.all_takes_2_same) * 3 +  # 5 * 3
-            len(self.all_takes_2_diff) * 3 +  # 10 * 3
-            len(self.all_takes_1) * 2 +       # 5 * 2
-            1                                 # discard
+        cls.take_dim = (
+            len(cls.all_takes_3) * 4 +       # 10 * 4
+            len(cls.all_takes_2_same) * 3 +  # 5 * 3
+            len(cls.all_takes_2_diff) * 3 +  # 10 * 3
+            len(cls.all_takes_1) * 2 +       # 5 * 2
+            1                                # discard
         )
 
-        self.buy_dim = (
+        cls.buy_dim = (
             3 * 4 * 2 +  # 3 tiers × 4 cards per tier × (w/wo gold)
             3 * 2        # 3 reserve slots × (w/wo gold)
         )
 
-        self.reserve_dim = (
+        cls.reserve_dim = (
             3 * 5 # 3 tiers * (4 cards per tier + top of deck)
         )
 
-        self.action_dim = self.take_dim + self.buy_dim + self.reserve_dim
+        cls.action_dim = cls.take_dim + cls.buy_dim + cls.reserve_dim
+
+    @classmethod
+    def _initialize_take_table(cls) -> None:
+        """Take legality only depends on the board supply up to a
+        relabeling of colors, so it is tabled for the 126 canonical
+        supplies (x 11 gem totals) instead of all 3125.
+        """
+        boards = canonical_boards()
+        cls.take_board_rows = np.full(5**5, -1, dtype=int)
+        cls.take_board_rows[board_codes(boards)] = np.arange(len(boards))
+
+        # Every board and gem total at once: a take is legal if the
+        # supply covers it, in the discard variant its gem total needs
+        # (taking n gems past 10 means n discards)
+        gem_total = np.arange(11)
+        cls.take_table = np.zeros((len(boards), 11, cls.take_dim), dtype=bool)
+        for required, base, n_variants, free in (
+            (cls.all_takes_3, 0, 4, 7),
+            (2 * cls.all_takes_2_same, 40, 3, 8),  # Needs 4 of the color
+            (cls.all_takes_2_diff, 55, 3, 8),
+            (cls.all_takes_1, 85, 2, 9),
+        ):
+            supply_ok = np.all(boards[:, None] >= required[:, :5], axis=2)
+            n_discards = np.maximum(gem_total - free, 0)
+            moves = base + n_variants * np.arange(len(required)) + n_discards[:, None]
+            cls.take_table[:, gem_total[:, None], moves] = supply_ok[:, None]
+        cls.take_table[:, 10, cls.take_dim - 1] = True  # Backup discard
+
+        # Gems taken by each take move, then its canonical move per relabeling
+        move_gems = np.zeros((cls.take_dim, 6), dtype=int)
+        for takes, base, n_variants in (
+            (cls.all_takes_3, 0, 4),
+            (cls.all_takes_2_same, 40, 3),
+            (cls.all_takes_2_diff, 55, 3),
+            (cls.all_takes_1, 85, 2),
+        ):
+            move_gems[base:base + len(takes)*n_variants] = np.repeat(takes, n_variants, axis=0)
+        relabel = relabel_moves(move_gems)
+        cls.take_relabel = np.argsort(relabel, axis=1)
 
     def get_bought_card(self, card) -> None:
         """Handles all buying on the player's end except
@@ -88,6 +241,11 @@ class Player:
         self.cards[card.gem] += 1
         self.points += card.points
         self.card_ids[card.gem].append((card.tier, card.id))
+        self._refresh_aggregates()
+
+    def claim_noble(self, noble) -> None:
+        self.noble_ids.append(noble.id)
+        self.points += noble.points
 
     def auto_spend(self, raw_cost: ndarray, with_gold: bool) -> ndarray:
         """For now, random spend logic.  Modifies player gems 
@@ -108,9 +266,10 @@ class Player:
 
         # Return spent_gems so the board can update as well
         self.gems -= spent_gems
+        self._refresh_aggregates()
         return spent_gems
 
-    def auto_take(self, gems_to_take: ndarray) -> tuple[ndarray, int]:
+    def auto_take(self, gems_to_take: ndarray, rng=np.random) -> tuple[ndarray, int]:
         """Add gems_to_take to self.gems, and if discards are
         needed try to discard gems that weren't taken (avoids 
         combinatorial discard space and does not significantly 
@@ -126,24 +285,12 @@ class Player:
 
         # Add gems to self.gems and handle reserve gold reward
         self.gems += gems_to_take  # Always add gems
-        self_gems = self.gems[:5]
-        
+
         # Now discard if required
-        n_discards = max(0, self.gems.sum() - 10)
-        discards = np.zeros(6, dtype=int)
-
-        while discards.sum() < n_discards:
-            # Try to prefer discarding gems we didn't take
-            discard_prefs = np.where((self_gems > 0) & (gems_to_take[:5] == 0))[0]
-            if discard_prefs.size > 0:
-                color = np.random.choice(discard_prefs)
-            else:
-                discardable = np.where(self_gems > 0)[0]
-                color = np.random.choice(discardable)
-
-            # Discard 1 gem from that color
-            self_gems[color] -= 1
-            discards[color] += 1
+        n_discards = max(0, int(self.gems.sum()) - 10)
+        discards = sample_discards(self.gems, gems_to_take, n_discards, rng)
+        self.gems -= discards
+        self._refresh_aggregates()
 
         # Gems we were supposed to take minus what we had to disard
         net_take = gems_to_take - discards
@@ -155,92 +302,50 @@ class Player:
         return net_take, n_discards
 
     def _get_legal_takes(self, board_gems: ndarray) -> ndarray:
-        """For each possible take, there are ||take|| possible
-        discards.  Because these are automatically discarded
-        there is no combinatorics needed.
+        """Table lookup on the canonical board, relabeled back."""
+        board, perm = canonicalize(board_gems)
+        row = self.take_board_rows[board_codes(board)]
+        canonical_mask = self.take_table[row, self.gem_total]
+        return canonical_mask[self.take_relabel[perm_index(perm)]]
+
+    def candidate_costs(self, board_cards) -> tuple[ndarray, ndarray]:
+        """Stacks the 12 shop cards and 3 reserve slots into a
+        (15, 6) cost matrix, plus a mask of which slots hold a card.
         """
-        legal_take_mask = np.zeros(96, dtype=bool)
-
-        """TAKE 3"""
-        n_discards = max(0, -7+self.gems.sum())
-        for index, combo in enumerate(self.all_takes_3):
-            if np.all(board_gems >= combo):
-                legal_take_mask[4*index + n_discards] = True
-
-        """TAKE 2 (SAME)"""
-        n_discards = max(0, n_discards-1)
-        for gem_index in range(5):
-            if board_gems[gem_index] >= 4:
-                legal_take_mask[40 + 3*gem_index + n_discards] = True
-
-        """TAKE 2 (DIFFERENT)"""
-        for index, combo in enumerate(self.all_takes_2_diff):
-            if np.all(board_gems >= combo):
-                legal_take_mask[55 + 3*index + n_discards] = True
+        costs = np.zeros((15, 6), dtype=int)
+        present = np.zeros(15, dtype=bool)
+        for tier_index in range(3):
+            for card_index in range(4):
+                card = board_cards[tier_index][card_index]
+                if card:
+                    costs[4*tier_index + card_index] = card.cost
+                    present[4*tier_index + card_index] = True
 
-        """TAKE 1"""
-        n_discards = max(0, n_discards-1)
-        for index, combo in enumerate(self.all_takes_1):
-            if np.all(board_gems >= combo):
-                legal_take_mask[85 + 2*index + n_discards] = True
+        for reserve_index, card in enumerate(self.reserved_cards):
+            costs[12 + reserve_index] = card.cost
+            present[12 + reserve_index] = True
 
-        """Backup discard"""
-        if self.gems.sum() == 10:
-            legal_take_mask[-1] = True
+        return costs, present
 
-        return legal_take_mask
+    def affordability(self, costs: ndarray) -> Affordability:
+        return affordability(costs, self.gems, self.cards)
 
     def can_afford_card(self, card) -> tuple[bool, bool]:
-        # Calculate costs
-        gem_difference = card.cost - self.effective_gems
-        gold_needed = np.maximum(gem_difference, 0).sum()
-
-        # Check if we can afford it
-        afford_wo_gold = (gold_needed == 0)
-        afford_with_gold = (gold_needed <= self.effective_gems[5])
-
-        return afford_wo_gold, afford_with_gold
+        aff = self.affordability(card.cost[None])
+        return bool(aff.afford_wo_gold[0]), bool(aff.afford_with_gold[0])
 
     def gold_choice_exists(self, card) -> bool:
-        cost = np.maximum(card.cost - self.cards, 0)
-        colored_cost = cost[:5].sum()
-        colored_pay = np.minimum(self.gems[:5], cost[:5]).sum()
-        gold_needed = colored_cost - colored_pay
-
-        # No payment required, so no choice to use gold
-        if colored_cost == 0:
-            return False
-
-        # Gold isn't required but we have gold
-        if gold_needed == 0:
-            return self.gems[5] > 0
-
-        # Gold is required but we have surplus
-        return self.gems[5] > gold_needed
-
-    def _get_legal_buys(self, board_cards) -> list:
-        legal_buy_mask = []
-
-        # Buy card
-        for tier_index in range(3):
-            for card_index in range(4):
-                if board_cards[tier_index][card_index]:
-                    card = board_cards[tier_index][card_index]
-                    afford_wo_gold, afford_with_gold = self.can_afford_card(card)
-                    legal_buy_mask.extend([afford_wo_gold, afford_with_gold])
-                else:
-                    legal_buy_mask.extend([False, False])
-
-        # Buy a reserved card
-        for reserve_index in range(3):
-            if reserve_index < len(self.reserved_cards):
-                card = self.reserved_cards[reserve_index]
-                afford_wo_gold, afford_with_gold = self.can_afford_card(card)
-                legal_buy_mask.extend([afford_wo_gold, afford_with_gold])
-            else:
-                legal_buy_mask.extend([False, False])
-
-        return legal_buy_mask
+        return bool(self.affordability(card.cost[None]).gold_choice[0])
+
+    def _get_legal_buys(self, board_cards) -> ndarray:
+        """(w/o gold, with gold) pairs for 12 shop cards then 3 reserves."""
+        costs, present = self.candidate_costs(board_cards)
+        aff = self.affordability(costs)
+        legal_buy_mask = np.stack(
+            (aff.afford_wo_gold & present, aff.afford_with_gold & present),
+            axis=1
+        )
+        return legal_buy_mask.ravel()
 
     def _get_legal_reserves(self, board) -> list:
         """This will almost never happen after a bit of training"""
@@ -289,11 +394,11 @@ class Player:
         # Gems (6+1 = 7)
         state_vector[:6] = self.gems / 4.0
         state_vector[5] /= 1.25  # Normalize to 5
-        state_vector[6] = self.gems.sum() / 10.0
+        state_vector[6] = self.gem_total / 10.0
 
         # Cards (5+1 = 6)
         state_vector[7:13] = self.cards  # Note there are no gold cards
-        state_vector[12] = self.cards.sum() / 10  # so we overwrite [12]
+        state_vector[12] = self.card_total / 10  # so we overwrite [12]
 
         # Reserved cards (11*3 = 33)
         start = 13
@@ -308,7 +413,14 @@ class Player:
 
     def clone(self):
         clone = Player.__new__(Player)
-        clone.__dict__ = self.__dict__.copy()
+        for attr in Player.__slots__:
+            setattr(clone, attr, getattr(self, attr))
         clone.gems  = self.gems.copy()
         clone.cards = self.cards.copy()
+        clone.effective_gems = self.effective_gems.copy()
         return clone
+
+
+Player._initialize_all_takes()
+Player._initialize_dimensions()
+Player._initialize_take_table()
@@ -0,0 +1,511 @@
+# Splendor/Environment/batched_game.py
+"""Array-backed mirror of GUIGame that holds many games at once.
+
+Every game lives in one row of a set of numpy arrays, so legality,
+encoding and move application run as a handful of vector ops over
+the whole batch.  Cards are stored by id and looked up in the global
+card table (id 0 is the empty slot).  Rules, move indices and the
+251-dim state layout match GUIGame/Player exactly.
+"""
+
+import itertools as it
+
+import numpy as np
+
+from Splendor.Environment.Splendor_components.Board_components.deck import (
+    CARD_COSTS, CARD_GEMS, CARD_POINTS, CARD_TIERS, GEM_ONE_HOT
+)
+from Splendor.Environment.Splendor_components.Player_components.player import (
+    Player, affordability, sample_discards
+)
+
+N_ACTIONS = Player.action_dim  # 141
+STATE_DIM = 251
+TAKE_DIM = Player.take_dim     # 96
+BUY_DIM = Player.buy_dim       # 30
+
+
+def _build_take_tables():
+    """Rows of every take move in mask order: 10 take-3, 5 take-2
+    same, 10 take-2 different, 5 take-1.  For each row we keep the
+    gems taken, the board supply required, the first move index and
+    how many gems the player may hold before a discard is owed.
+    """
+    gems, required, base, free = [], [], [], []
+    for i, combo in enumerate(it.combinations(range(5), 3)):
+        row = np.zeros(6, dtype=int)
+        row[list(combo)] = 1
+        gems.append(row); required.append(row); base.append(4*i); free.append(7)
+    for g in range(5):
+        row = np.zeros(6, dtype=int)
+        row[g] = 2
+        req = np.zeros(6, dtype=int)
+        req[g] = 4
+        gems.append(row); required.append(req); base.append(40 + 3*g); free.append(8)
+    for i, combo in enumerate(it.combinations(range(5), 2)):
+        row = np.zeros(6, dtype=int)
+        row[list(combo)] = 1
+        gems.append(row); required.append(row); base.append(55 + 3*i); free.append(8)
+    for g in range(5):
+        row = np.zeros(6, dtype=int)
+        row[g] = 1
+        gems.append(row); required.append(row); base.append(85 + 2*g); free.append(9)
+
+    gems, required = np.array(gems), np.array(required)
+    base, free = np.array(base), np.array(free)
+
+    # Gems taken by each take move index (discard variants included)
+    action_take = np.zeros((TAKE_DIM, 6), dtype=int)
+    for row, start in enumerate(base):
+        n_variants = 10 - free[row] + 1
+        action_take[start:start+n_variants] = gems[row]
+    return gems, required, base, free, action_take
+
+TAKE_GEMS, TAKE_REQUIRED, TAKE_BASE, TAKE_FREE, ACTION_TAKE = _build_take_tables()
+NOBLE_IDS = np.arange(91, 101)
+
+
+def draw_slots(moves: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Which random deck draw each move triggers, if any.
+    Returns (tier, slot, blind): tier is -1 when nothing is drawn,
+    slot is the refilled shop slot (0-11) and blind marks a reserve
+    from the top of a deck.  A draw from an empty deck is not checked.
+    """
+    rel = moves - TAKE_DIM
+    shop_buy = (rel >= 0) & (rel < 24)
+    rel_res = moves - TAKE_DIM - BUY_DIM
+    shop_res = (rel_res >= 0) & (rel_res % 5 < 4)
+    blind = (rel_res >= 0) & (rel_res % 5 == 4)
+    slot = np.where(shop_buy, rel // 2, 4*(rel_res // 5) + rel_res % 5)
+    tier = np.where(blind, rel_res // 5, slot // 4)
+    tier = np.where(shop_buy | shop_res | blind, tier, -1)
+    return tier, slot, blind
+
+
+def _card_vectors(ids: np.ndarray, effective_gems: np.ndarray) -> np.ndarray:
+    """Card.to_vector for a (..., K) stack of ids; empty slots are 0."""
+    out = np.zeros(ids.shape + (11,), dtype=np.float32)
+    out[..., :5] = GEM_ONE_HOT[CARD_GEMS[ids]]
+    out[..., 5] = CARD_POINTS[ids] / 15
+    clipped = np.maximum(CARD_COSTS[ids][..., :5] - effective_gems[..., None, :5], 0)
+    out[..., 6:] = clipped / 4
+    out[ids == 0] = 0
+    return out
+
+
+class BatchedGame:
+    """N independent games as arrays.  Player axis is the index
+    into GUIGame.players, and the active player of each game is
+    (start + half_turns) % 2, as in GUIGame.
+    """
+    FIELDS = (
+        "board_gems", "shop", "decks", "deck_len", "nobles",
+        "gems", "cards", "reserved", "reserved_hidden", "n_reserved", "points",
+        "start", "half_turns", "victor",
+    )
+
+    def __init__(self, n: int):
+        self.board_gems = np.zeros((n, 6), dtype=int)
+        self.shop = np.zeros((n, 3, 4), dtype=int)      # card ids
+        self.decks = np.zeros((n, 3, 40), dtype=int)    # draw from the end
+        self.deck_len = np.zeros((n, 3), dtype=int)
+        self.nobles = np.zeros((n, 3), dtype=int)       # noble ids
+        self.gems = np.zeros((n, 2, 6), dtype=int)
+        self.cards = np.zeros((n, 2, 6), dtype=int)
+        self.reserved = np.zeros((n, 2, 3), dtype=int)  # packed left
+        self.reserved_hidden = np.zeros((n, 2, 3), dtype=bool)  # blind reserves
+        self.n_reserved = np.zeros((n, 2), dtype=int)
+        self.points = np.zeros((n, 2), dtype=int)
+        self.start = np.zeros(n, dtype=int)
+        self.half_turns = np.zeros(n, dtype=int)
+        self.victor = np.zeros((n, 2), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    # Construction
+    @classmethod
+    def new(cls, n: int, rng: np.random.Generator) -> "BatchedGame":
+        """Deal n fresh games."""
+        batch = cls(n)
+        batch.board_gems[:] = [4, 4, 4, 4, 4, 5]
+        for tier in range(3):
+            ids = np.flatnonzero(CARD_TIERS == tier)
+            order = rng.permuted(np.broadcast_to(ids, (n, len(ids))), axis=1)
+            batch.decks[:, tier, :len(ids)] = order
+            batch.deck_len[:, tier] = len(ids)
+        for tier in range(3):
+            for pos in range(4):
+                batch.shop[:, tier, pos] = batch._draw(np.arange(n), np.full(n, tier))
+
+        nobles = rng.permuted(np.broadcast_to(NOBLE_IDS, (n, len(NOBLE_IDS))), axis=1)
+        batch.nobles[:] = nobles[:, -3:][:, ::-1]
+        batch.start[:] = rng.integers(0, 2, n)
+        return batch
+
+    @classmethod
+    def from_game(cls, game) -> "BatchedGame":
+        """Snapshot a GUIGame into a batch of one."""
+        batch = cls(1)
+        board = game.board
+        batch.board_gems[0] = board.gems
+        for tier in range(3):
+            for pos, card in enumerate(board.cards[tier]):
+                batch.shop[0, tier, pos] = card.id if card else 0
+            deck_ids = [card.id for card in board.decks[tier].cards]
+            batch.decks[0, tier, :len(deck_ids)] = deck_ids
+            batch.deck_len[0, tier] = len(deck_ids)
+        batch.nobles[0] = [noble.id if noble else 0 for noble in board.nobles]
+
+        for p, player in enumerate(game.players):
+            batch.gems[0, p] = player.gems
+            batch.cards[0, p] = player.cards
+            reserved = [card.id for card in player.reserved_cards]
+            batch.reserved[0, p, :len(reserved)] = reserved
+            batch.reserved_hidden[0, p, :len(reserved)] = [
+                card_id in player.hidden_reserves for card_id in reserved
+            ]
+            batch.n_reserved[0, p] = len(reserved)
+            batch.points[0, p] = player.points
+            batch.victor[0, p] = player.victor
+        batch.start[0] = game.start_idx
+        batch.half_turns[0] = game.half_turns
+        return batch
+
+    def take(self, indices) -> "BatchedGame":
+        """Copy of the selected games (also used for repeats)."""
+        indices = np.asarray(indices)
+        batch = BatchedGame.__new__(BatchedGame)
+        for field in self.FIELDS:
+            setattr(batch, field, getattr(self, field)[indices])
+        return batch
+
+    def repeat(self, k: int) -> "BatchedGame":
+        return self.take(np.repeat(np.arange(len(self)), k))
+
+    @classmethod
+    def concat(cls, batches) -> "BatchedGame":
+        """One batch holding the games of several, in order."""
+        batch = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(batch, field, np.concatenate([getattr(b, field) for b in batches]))
+        return batch
+
+    def assign(self, indices, other: "BatchedGame") -> None:
+        """Overwrite the selected games with the rows of other."""
+        for field in self.FIELDS:
+            getattr(self, field)[indices] = getattr(other, field)
+
+    # Views
+    @property
+    def active(self) -> np.ndarray:
+        return (self.start + self.half_turns) % 2
+
+    @property
+    def done(self) -> np.ndarray:
+        return self.victor.any(axis=1)
+
+    def candidate_ids(self) -> np.ndarray:
+        """(N, 15) ids of the 12 shop cards then the active player's
+        3 reserve slots, matching Player.candidate_costs.
+        """
+        idx = np.arange(len(self))
+        reserved = self.reserved[idx, self.active]
+        return np.concatenate((self.shop.reshape(-1, 12), reserved), axis=1)
+
+    def legal_moves(self) -> np.ndarray:
+        """(N, 141) mask, Player.get_legal_moves for every game."""
+        n = len(self)
+        idx = np.arange(n)
+        active = self.active
+        gems = self.gems[idx, active]
+        cards = self.cards[idx, active]
+        gem_total = gems.sum(axis=1)
+        mask = np.zeros((n, N_ACTIONS), dtype=bool)
+
+        # Takes: one discard variant per take row is legal
+        supply_ok = np.all(self.board_gems[:, None, :] >= TAKE_REQUIRED, axis=2)
+        n_discards = np.maximum(gem_total[:, None] - TAKE_FREE, 0)
+        take_idx = TAKE_BASE + n_discards
+        rows = np.broadcast_to(idx[:, None], take_idx.shape)
+        mask[rows[supply_ok], take_idx[supply_ok]] = True
+        mask[:, TAKE_DIM-1] = gem_total == 10  # backup discard
+
+        # Buys: (w/o gold, with gold) per candidate card
+        ids = self.candidate_ids()
+        aff = affordability(CARD_COSTS[ids], gems, cards)
+        present = ids > 0
+        buys = np.stack(
+            (aff.afford_wo_gold & present, aff.afford_with_gold & present), axis=2
+        )
+        mask[:, TAKE_DIM:TAKE_DIM+BUY_DIM] = buys.reshape(n, -1)
+
+        # Reserves: 4 shop slots + top of deck per tier
+        can_reserve = self.n_reserved[idx, active] < 3
+        reserves = np.concatenate(
+            (self.shop > 0, (self.deck_len > 0)[:, :, None]), axis=2
+        )
+        mask[:, TAKE_DIM+BUY_DIM:] = reserves.reshape(n, -1) & can_reserve[:, None]
+        return mask
+
+    def to_state(self) -> np.ndarray:
+        """(N, 251) float32, GUIGame.to_state for every game."""
+        n = len(self)
+        idx = np.arange(n)
+        seats = (self.active, 1 - self.active)  # hero, enemy
+        state = np.zeros((n, STATE_DIM), dtype=np.float32)
+
+        # Board (157)
+        hero_effective = self.gems[idx, seats[0]] + self.cards[idx, seats[0]]
+        state[:, :6] = self.board_gems / 4.0
+        state[:, 5] /= 1.25
+        state[:, 6] = self.board_gems.sum(axis=1) / 10.0
+        shop = _card_vectors(self.shop.reshape(n, 12), hero_effective)
+        state[:, 7:139] = shop.reshape(n, -1)
+
+        noble_vectors = np.zeros((n, 3, 6), dtype=np.float32)
+        noble_vectors[..., 0] = CARD_POINTS[self.nobles]
+        noble_vectors[..., 1:] = np.maximum(
+            CARD_COSTS[self.nobles][..., :5] - hero_effective[:, None, :5], 0
+        )
+        noble_vectors[self.nobles == 0] = 0
+        state[:, 139:157] = noble_vectors.reshape(n, -1) / 4.0
+
+        # Players (47 each)
+        for start, seat in zip((157, 204), seats):
+            gems = self.gems[idx, seat]
+            cards = self.cards[idx, seat]
+            block = state[:, start:start+47]
+            block[:, :6] = gems / 4.0
+            block[:, 5] /= 1.25
+            block[:, 6] = gems.sum(axis=1) / 10.0
+            block[:, 7:13] = cards
+            block[:, 12] = cards.sum(axis=1) / 10
+            reserved = _card_vectors(self.reserved[idx, seat], gems + cards)
+            block[:, 13:46] = reserved.reshape(n, -1)
+            block[:, 46] = self.points[idx, seat] / 15
+
+        return state
+
+    # Lookahead
+    def expand(self, legal: np.ndarray | None = None, rng=np.random):
+        """Apply every legal move of every game to a copy.
+        Returns (parent, moves, children) where children[j] is
+        games[parent[j]] after moves[j].
+        """
+        if legal is None:
+            legal = self.legal_moves()
+        parent, moves = np.nonzero(legal)
+        children = self.take(parent)
+        children.step(moves, rng)
+        return parent, moves, children
+
+    def expected_states(self, parent, moves, children) -> np.ndarray:
+        """children.to_state() with every card revealed by a random
+        draw replaced by its expectation over the parent's remaining
+        deck: shop refills after a buy/reserve and the hidden card of
+        a reserve from the top of a deck.
+        """
+        states = children.to_state()
+        idx = np.arange(len(children))
+
+        # Which tier was drawn from, and where the card was encoded
+        tier, slot, deck_res = draw_slots(moves)
+        drew = (tier >= 0) & (self.deck_len[parent, tier] > 0)
+        rows = np.flatnonzero(drew)
+        if not rows.size:
+            return states
+
+        # Encode the whole remaining deck against whoever sees it
+        new_active = children.active[rows]
+        mover = 1 - new_active
+        seat = np.where(deck_res[rows], mover, new_active)
+        effective = children.gems[rows, seat] + children.cards[rows, seat]
+        deck = self.decks[parent[rows], tier[rows]]
+        vectors = _card_vectors(deck, effective)
+        expected = vectors.sum(axis=1) / self.deck_len[parent[rows], tier[rows], None]
+
+        # Shop slot in the board block, reserve slot in the enemy block
+        reserve_slot = children.n_reserved[rows, mover] - 1
+        start = np.where(
+            deck_res[rows], 204 + 13 + 11*reserve_slot, 7 + 11*slot[rows]
+        )
+        cols = start[:, None] + np.arange(11)
+        states[idx[rows, None], cols] = expected
+        return states
+
+    def unseen(self, i: int, tier: int, viewer: int) -> np.ndarray:
+        """Sorted ids of tier cards the viewer can't see in game i:
+        the rest of the deck plus the opponent's blind reserves.
+        """
+        deck = self.decks[i, tier, :self.deck_len[i, tier]]
+        opp = 1 - viewer
+        hidden = self.reserved[i, opp][self.reserved_hidden[i, opp]]
+        hidden = hidden[CARD_TIERS[hidden] == tier]
+        return np.sort(np.concatenate((deck, hidden)))
+
+    def force_top(self, idx: np.ndarray, tier: np.ndarray, card: np.ndarray) -> None:
+        """Determinize the next draw of each (game, tier) to card.
+        If card is one of a player's blind reserves, that reserve is
+        swapped with the current top card instead, which no player
+        who could not see the card can tell apart.
+        """
+        top = self.deck_len[idx, tier] - 1
+        decks = self.decks[idx, tier]
+        in_deck = decks == card[:, None]
+        found = in_deck.any(axis=1)
+
+        # Swap within the deck
+        rows = np.flatnonzero(found)
+        pos = np.argmax(in_deck[rows], axis=1)
+        i, t = idx[rows], tier[rows]
+        top_cards = self.decks[i, t, top[rows]]
+        self.decks[i, t, pos] = top_cards
+        self.decks[i, t, top[rows]] = card[rows]
+
+        # Swap with a blind reserve (rare, so row by row)
+        for row in np.flatnonzero(~found):
+            i, t = idx[row], tier[row]
+            seat, slot = np.argwhere(self.reserved[i] == card[row])[0]
+            assert self.reserved_hidden[i, seat, slot], "Card is not hidden"
+            self.reserved[i, seat, slot] = self.decks[i, t, top[row]]
+            self.decks[i, t, top[row]] = card[row]
+
+    # Mutation
+    def _draw(self, idx: np.ndarray, tier: np.ndarray) -> np.ndarray:
+        """Deck.draw for each (game, tier) pair; 0 if the deck is empty."""
+        has_card = self.deck_len[idx, tier] > 0
+        top = np.maximum(self.deck_len[idx, tier] - 1, 0)
+        card = np.where(has_card, self.decks[idx, tier, top], 0)
+        self.decks[idx[has_card], tier[has_card], top[has_card]] = 0
+        self.deck_len[idx[has_card], tier[has_card]] -= 1
+        return card
+
+    def step(self, actions: np.ndarray, rng=np.random) -> None:
+        """Apply one move per game for its active player, in place.
+        Mirrors GUIGame.apply_ai_move followed by the half-turn tick.
+        """
+        actions = np.asarray(actions)
+        n = len(self)
+        idx = np.arange(n)
+        active = self.active
+
+        # Take gems
+        take = np.flatnonzero(actions < TAKE_DIM - 1)
+        if take.size:
+            self._apply_takes(take, active[take], ACTION_TAKE[actions[take]], rng)
+
+        backup = np.flatnonzero(actions == TAKE_DIM - 1)
+        if backup.size:
+            seat = active[backup]
+            held = self.gems[backup, seat] > 0
+            noise = rng.random(held.shape)
+            noise[~held] = -1.0
+            discard = np.eye(6, dtype=int)[np.argmax(noise, axis=1)]
+            self.gems[backup, seat] -= discard
+            self.board_gems[backup] += discard
+
+        # Buy cards
+        buy = np.flatnonzero((actions >= TAKE_DIM) & (actions < TAKE_DIM + BUY_DIM))
+        if buy.size:
+            self._apply_buys(buy, active[buy], actions[buy] - TAKE_DIM)
+
+        # Reserve cards
+        reserve = np.flatnonzero(actions >= TAKE_DIM + BUY_DIM)
+        if reserve.size:
+            self._apply_reserves(reserve, active[reserve], actions[reserve] - TAKE_DIM - BUY_DIM, rng)
+
+        self.half_turns[idx] += 1
+
+    def _apply_takes(self, idx, seat, gems_to_take, rng) -> None:
+        """Player.auto_take + Board.take_gems."""
+        gems = self.gems[idx, seat] + gems_to_take
+        n_discards = np.maximum(gems.sum(axis=1) - 10, 0)
+        discards = sample_discards(gems, gems_to_take, n_discards, rng)
+        net_take = gems_to_take - discards
+        gold = gems_to_take[:, 5] > 0
+        net_take[gold, 5] = 1
+
+        self.gems[idx, seat] = gems - discards
+        self.board_gems[idx] -= net_take
+
+    def _apply_buys(self, idx, seat, move) -> None:
+        from_shop = move < 24
+        slot = np.where(from_shop, move // 2, 0)
+        tier, pos = slot // 4, slot % 4
+        reserve_idx = np.where(from_shop, 0, (move - 24) // 2)
+
+        card = np.where(
+            from_shop,
+            self.shop[idx, tier, pos],
+            self.reserved[idx, seat, reserve_idx]
+        )
+
+        # Refill the shop slot / pop the reserved card
+        shop_rows = np.flatnonzero(from_shop)
+        if shop_rows.size:
+            i = idx[shop_rows]
+            self.shop[i, tier[shop_rows], pos[shop_rows]] = self._draw(i, tier[shop_rows])
+        res_rows = np.flatnonzero(~from_shop)
+        if res_rows.size:
+            self._pop_reserved(idx[res_rows], seat[res_rows], reserve_idx[res_rows])
+
+        # Player.auto_spend
+        gems = self.gems[idx, seat]
+        cards = self.cards[idx, seat]
+        card_cost = np.maximum(CARD_COSTS[card] - cards, 0)
+        spent = np.minimum(gems, card_cost)
+        with_gold = (move % 2).astype(bool)
+        spent[with_gold, 5] = (card_cost.sum(axis=1) - spent.sum(axis=1))[with_gold]
+        self.gems[idx, seat] = gems - spent
+        self.board_gems[idx] += spent
+
+        # Player.get_bought_card
+        cards[np.arange(len(idx)), CARD_GEMS[card]] += 1
+        self.cards[idx, seat] = cards
+        self.points[idx, seat] += CARD_POINTS[card]
+
+        # Noble visits and end of game
+        nobles = self.nobles[idx]
+        visits = (nobles > 0) & np.all(
+            cards[:, None, :] >= CARD_COSTS[nobles], axis=2
+        )
+        self.points[idx, seat] += (CARD_POINTS[nobles] * visits).sum(axis=1)
+        self.nobles[idx] = np.where(visits, 0, nobles)
+        self.victor[idx, seat] = self.points[idx, seat] >= 15
+
+    def _pop_reserved(self, idx, seat, reserve_idx) -> None:
+        """list.pop(reserve_idx) on each packed reserve row."""
+        keep = np.arange(3) < reserve_idx[:, None]
+        for field in (self.reserved, self.reserved_hidden):
+            rows = field[idx, seat]
+            shifted = np.zeros_like(rows)
+            shifted[:, :2] = rows[:, 1:]
+            field[idx, seat] = np.where(keep, rows, shifted)
+        self.n_reserved[idx, seat] -= 1
+
+    def _apply_reserves(self, idx, seat, move, rng) -> None:
+        tier, pos = move // 5, move % 5
+        from_shop = pos < 4
+        card = np.zeros(len(idx), dtype=int)
+
+        shop_rows = np.flatnonzero(from_shop)
+        if shop_rows.size:
+            i, t, p = idx[shop_rows], tier[shop_rows], pos[shop_rows]
+            card[shop_rows] = self.shop[i, t, p]
+            self.shop[i, t, p] = self._draw(i, t)
+        deck_rows = np.flatnonzero(~from_shop)
+        if deck_rows.size:
+            card[deck_rows] = self._draw(idx[deck_rows], tier[deck_rows])
+
+        self.reserved[idx, seat, self.n_reserved[idx, seat]] = card
+        self.reserved_hidden[idx, seat, self.n_reserved[idx, seat]] = ~from_shop
+        self.n_reserved[idx, seat] += 1
+
+        # Gold reward if there's any left
+        gets_gold = np.flatnonzero(self.board_gems[idx, 5] > 0)
+        if gets_gold.size:
+            gold = np.zeros((gets_gold.size, 6), dtype=int)
+            gold[:, 5] = 1
+            self._apply_takes(idx[gets_gold], seat[gets_gold], gold, rng)
+
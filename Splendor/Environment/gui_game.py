@@ -5,28 +5,36 @@ import numpy as np
 from typing import TYPE_CHECKING
 from secrets import randbelow
 
-from Splendor.Environment import Board, Player
+from Splendor.Environment import Board, Player, BatchedGame
 if TYPE_CHECKING:
     from Splendor.Play.common_types import GUIMove
 
 
 class GUIGame:
-    def __init__(self, players, model):
-        """Note: rest of init is performed by reset()"""
+    def __init__(self, players, model, lookahead: bool = False, seed: int | None = None):
+        """Note: rest of init is performed by reset().
+        lookahead picks AI moves by 1-ply successor values
+        when the agent's model has a value head.  seed fixes the
+        deals, first player and random discards, so games with
+        seeded agents replay exactly.
+        """
         self.players = [Player(name, agent, pos) for name, agent, pos in players]
         self.model = model
+        self.lookahead = lookahead
+        self.rng = None if seed is None else np.random.default_rng(seed)
         self.reset()
     
     def reset(self):
-        self.board = Board()
+        self.board = Board(self.rng)
 
         for player in self.players:
             player.reset()
 
-        self.start_idx = randbelow(2)
+        self.start_idx = randbelow(2) if self.rng is None else int(self.rng.integers(2))
         self.half_turns: int = 0
         self.move_idx: int | None = None
         self.victor: bool = False
+        self._pending: tuple[int, int] | None = None  # (half_turns, move_idx)
     
     @property
     def active_player(self):
@@ -36,8 +44,35 @@ class GUIGame:
     def inactive_player(self):
         return self.players[(self.start_idx + self.half_turns + 1) % 2]
     
+    def _choose_move(self) -> "int | GUIMove":
+        agent = self.active_player.agent
+        if hasattr(agent, "select_move"):  # Search agents need the whole game
+            return agent.select_move(self)
+        elif self.lookahead and getattr(agent, "has_value_head", False):
+            return self.lookahead_move(agent)
+        return self.active_player.choose_move(self.board, self.to_state())
+
+    def think(self, budget_ms: float) -> None:
+        """Work on the AI's upcoming move ahead of turn(), e.g. while
+        the GUI pauses after a human move.  Search agents search in
+        slices of budget_ms; other AI agents compute their move once
+        and turn() applies it without running inference.
+        """
+        agent = self.active_player.agent
+        if self.victor or hasattr(agent, "await_move"):  # Humans decide for themselves
+            return
+        if hasattr(agent, "ponder"):
+            agent.ponder(self, budget_ms)
+        elif self._pending is None or self._pending[0] != self.half_turns:
+            self._pending = (self.half_turns, self._choose_move())
+
     def turn(self) -> None:
-        move = self.active_player.choose_move(self.board, self.to_state())
+        if self._pending is not None and self._pending[0] == self.half_turns:
+            move = self._pending[1]
+        else:
+            move = self._choose_move()
+        self._pending = None
+
         if isinstance(move, int):
             self.move_idx = move
             self.apply_ai_move(move)
@@ -52,6 +87,11 @@ class GUIGame:
         
         self.half_turns += 1
 
+        # Let searching agents carry their trees over to the new position
+        for player in self.players:
+            if hasattr(player.agent, "advance"):
+                player.agent.advance(self)
+
     def apply_human_move(self, move: "GUIMove") -> None:
         """Handles moves sent from the GUI.
         Note that these moves are always complete, with
@@ -61,11 +101,11 @@ class GUIGame:
         player, board = self.active_player, self.board
 
         if move.kind == "take":
-            player.gems += move.take
+            player.adjust_gems(move.take)
             board.gems  -= move.take
 
             if move.discard is not None:
-                player.gems -= move.discard
+                player.adjust_gems(-move.discard)
                 board.gems  += move.discard
 
         elif move.kind == "buy":
@@ -77,8 +117,9 @@ class GUIGame:
             else:  # reserved
                 assert ft.reserve_idx is not None, "reserve ft has no reserve_index"
                 bought = player.reserved_cards.pop(ft.reserve_idx)
+                player.hidden_reserves.discard(bought.id)
 
-            player.gems -= move.spend
+            player.adjust_gems(-move.spend)
             self.board.return_gems(move.spend)
             player.get_bought_card(bought)
 
@@ -96,11 +137,13 @@ class GUIGame:
                 reserved, gold = board.reserve_from_deck(ft.tier)
             
             player.reserved_cards.append(reserved)
+            if ft.kind == "deck":
+                player.hidden_reserves.add(reserved.id)
             if move.kind == "reserve" and gold[5]:
                 if move.discard is not None and move.discard.sum():
-                    player.gems -= move.discard
+                    player.adjust_gems(-move.discard)
                     board.gems += move.discard
-                player.gems += gold
+                player.adjust_gems(gold)
                 board.gems -= gold
         else:
             raise ValueError(f"apply_human_move recieved unexpected move.kind: {move.kind}")
@@ -108,10 +151,11 @@ class GUIGame:
     def apply_ai_move(self, move_idx: int) -> None:
         """Deeply sorry for the magic numbers approach."""
         player, board = self.active_player, self.board
+        rng = np.random if self.rng is None else self.rng
 
         # Take gems moves
         if move_idx < player.take_dim:
-            gems_to_take: np.ndarray = np.zeros(6)
+            gems_to_take: np.ndarray = np.zeros(6, dtype=int)
             if move_idx < 40: # all_takes_3; 10 * 4discards
                 gems_to_take = player.all_takes_3[move_idx // 4]
             elif move_idx < 55: # all_takes_2_same; 5 * 3discards
@@ -122,11 +166,12 @@ class GUIGame:
                 gems_to_take = player.all_takes_1[(move_idx-85) // 2]
             else:  # All else is illegal, discard
                 legal_discards = np.where(player.gems > 0)[0]
-                discard_idx = np.random.choice(legal_discards)
-                player.gems[discard_idx] -= 1
-                board.gems[discard_idx] += 1
+                discard = np.zeros(6, dtype=int)
+                discard[rng.choice(legal_discards)] = 1
+                player.adjust_gems(-discard)
+                board.return_gems(discard)
 
-            taken_gems, _ = player.auto_take(gems_to_take)
+            taken_gems, _ = player.auto_take(gems_to_take, rng)
             board.take_gems(taken_gems)
             
             return
@@ -140,6 +185,7 @@ class GUIGame:
             else:  # Buy reserved, 3 cards * w&w/o gold
                 card_index = (move_idx-24) // 2
                 bought_card = player.reserved_cards.pop(card_index)
+                player.hidden_reserves.discard(bought_card.id)
 
             # Spend the tokens
             with_gold = move_idx % 2  # All odd indices are gold spends
@@ -169,8 +215,10 @@ class GUIGame:
                 reserved_card, gold = board.reserve_from_deck(tier)
 
             player.reserved_cards.append(reserved_card)
+            if card_index == 4:
+                player.hidden_reserves.add(reserved_card.id)
             if gold[5]:
-                discard_if_gt10, _ = player.auto_take(gold)
+                discard_if_gt10, _ = player.auto_take(gold, rng)
                 board.take_gems(discard_if_gt10)
 
             return
@@ -179,9 +227,36 @@ class GUIGame:
         for index, noble in enumerate(self.board.nobles):
             if noble and np.all(player.cards >= noble.cost):
                 self.board.nobles[index] = None
-                player.noble_ids.append(noble.id)
-                player.points += noble.points
+                player.claim_noble(noble)
     
+    def successor_states(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Every legal move from the current position, applied to a
+        batched copy of the game in one vectorized step.
+
+        Returns (moves, states, wins): move indices (k,), successor
+        encodings (k, 251) from the opponent's perspective with random
+        deck draws replaced by their expectation, and whether each move
+        ends the game.
+        """
+        batch = BatchedGame.from_game(self)
+        parent, moves, children = batch.expand()
+        states = batch.expected_states(parent, moves, children)
+        return moves, states, children.done
+
+    def lookahead_values(self, model) -> tuple[np.ndarray, np.ndarray]:
+        """1-ply scores for every legal move with one batched forward
+        pass.  Values are from the side to move, so the mover's score
+        is the negated successor value; winning moves score +inf.
+        """
+        moves, states, wins = self.successor_states()
+        scores = -model.get_values(states)
+        scores[wins] = np.inf
+        return moves, scores
+
+    def lookahead_move(self, model) -> int:
+        moves, scores = self.lookahead_values(model)
+        return int(moves[np.argmax(scores)])
+
     def to_state(self) -> np.ndarray:
         board_vector = self.board.to_state(self.active_player.effective_gems)# 157
         hero_vector = self.active_player.to_state()                          # 47
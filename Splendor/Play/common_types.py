@@ -1,7 +1,7 @@
 # Splendor/Play/common_types.py
 
 from dataclasses import dataclass
-from typing import Tuple, NamedTuple, Literal, Optional, Union, TYPE_CHECKING
+from typing import Iterable, Iterator, Tuple, NamedTuple, Literal, Optional, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from numpy import ndarray
@@ -14,7 +14,7 @@ class CardIndex(NamedTuple):
     pos: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FocusTarget:
     kind: Literal["shop", "deck", "reserved"]
     tier: Optional[int] = None  # shop/deck
@@ -34,7 +34,7 @@ class FocusTarget:
         return CardIndex(self.tier, self.pos) if self.kind == "shop" else None  # type: ignore
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GUIMove:
     kind: Literal["take", "buy", "buy_choose",
                   "reserve", "reserve_with_discard", "reserve_skip_gold"]
@@ -55,4 +55,43 @@ ReservedCardToken = Tuple[Literal["reserved_card"], int, int]  # reserve_idx, mo
 GemToken = Tuple[Literal["board_gem", "player_gem"], int]  # gem_index 0‑4 (no gold)
 
 ClickToken = Union[BoardCardToken, ReservedCardToken, GemToken]
-ClickMap = dict["Rect", ClickToken]
+
+
+class ClickMap:
+    """Clickable board rects and their tokens in z-order, later ones
+    on top.  A uniform grid of buckets answers point queries and a
+    dict answers lookups by token, so neither scans every target.
+    Built once per scene by BoardRenderer.render.
+    """
+    def __init__(self, marks: Iterable[tuple["Rect", ClickToken]] = (), cell: int = 100):
+        self.cell = cell
+        self._marks = list(marks)
+        self._grid: dict[tuple[int, int], list[int]] = {}
+        self._rects: dict[tuple, "Rect"] = {}
+
+        for i, (rect, token) in enumerate(self._marks):
+            for gx in range(rect.x0 // cell, (rect.x1 - 1) // cell + 1):
+                for gy in range(rect.y0 // cell, (rect.y1 - 1) // cell + 1):
+                    self._grid.setdefault((gx, gy), []).append(i)
+
+            # Every prefix, so ("reserved_card", idx) finds its card
+            for n in range(2, len(token) + 1):
+                self._rects[token[:n]] = rect
+
+    def hit(self, x: int, y: int) -> tuple["Rect", ClickToken] | None:
+        """Topmost (rect, token) containing the board point."""
+        for i in reversed(self._grid.get((x // self.cell, y // self.cell), ())):
+            rect, token = self._marks[i]
+            if rect.contains(x, y):
+                return rect, token
+        return None
+
+    def rect_of(self, *key) -> "Rect | None":
+        """Rect of the topmost token that starts with key."""
+        return self._rects.get(key)
+
+    def items(self) -> Iterator[tuple["Rect", ClickToken]]:
+        return iter(self._marks)
+
+    def __len__(self) -> int:
+        return len(self._marks)
@@ -0,0 +1,139 @@
+# Splendor/Play/render/cache.py
+"""Bounded caches for rendered surfaces and images."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # Browser builds without threads
+    ThreadPoolExecutor = None
+
+
+class LRUCache:
+    def __init__(self, budget: float, weigh: Callable[[Any], float] = lambda value: 1):
+        """Evicts the least recently used entries once the summed
+        weight of the values passes budget.  The default weight
+        makes budget an entry count.
+        """
+        self.budget = budget
+        self.weigh = weigh
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self.size = 0.0
+        self.hits = self.misses = 0
+
+    def get(self, key: Hashable, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def __setitem__(self, key: Hashable, value) -> None:
+        if key in self._data:
+            self.size -= self._data.pop(key)[1]
+        weight = self.weigh(value)
+        self._data[key] = (value, weight)
+        self.size += weight
+
+        # Always keep the newest entry, even if it is over budget alone
+        while self.size > self.budget and len(self._data) > 1:
+            _, (_, old_weight) = self._data.popitem(last=False)
+            self.size -= old_weight
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size = 0.0
+
+
+class ImageCache:
+    def __init__(self, budget_bytes: float, nbytes: Callable[[Any], float]):
+        """LRU of loaded images within budget_bytes, nbytes giving
+        the size of an image.  Images can be loaded ahead of time,
+        on a background thread where threads are available.
+        """
+        self._lru = LRUCache(budget_bytes, nbytes)
+        self._lock = threading.Lock()
+        self._pending: dict[Hashable, Callable[[], Any]] = {}
+        self._pool = None
+        self._threads = ThreadPoolExecutor is not None
+
+    def get(self, key: Hashable, load: Callable[[], Any]):
+        """Cached image for key, loaded with load() on a miss."""
+        with self._lock:
+            image = self._lru.get(key)
+        if image is None:
+            image = load()
+            with self._lock:
+                self._lru[key] = image
+                self._pending.pop(key, None)
+        return image
+
+    def preload(self, items) -> None:
+        """Load (key, load) items now."""
+        for key, load in items:
+            self.get(key, load)
+
+    def prefetch(self, items) -> None:
+        """Queue (key, load) items that aren't cached yet and load
+        them in the background.  Without threads they wait for
+        drain().
+        """
+        with self._lock:
+            for key, load in items:
+                if key not in self._lru:
+                    self._pending.setdefault(key, load)
+            if not self._pending or not self._threads:
+                return
+
+        try:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(1, thread_name_prefix="image-prefetch")
+            self._pool.submit(self.drain)
+        except RuntimeError:  # Can't start threads here
+            self._threads = False
+
+    def drain(self, limit: int | None = None) -> int:
+        """Load up to limit queued images, returns how many."""
+        loaded = 0
+        while limit is None or loaded < limit:
+            with self._lock:
+                if not self._pending:
+                    break
+                key = next(iter(self._pending))
+                load = self._pending.pop(key)
+                if key in self._lru:
+                    continue
+            self.get(key, load)
+            loaded += 1
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._pending.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._lru
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    @property
+    def threaded(self) -> bool:
+        """Whether prefetches load in the background."""
+        return self._threads
+
+    @property
+    def nbytes(self) -> float:
+        return self._lru.size
@@ -0,0 +1,154 @@
+# Splendor/Play/render/canvas.py
+"""Drawing backends for BoardRenderer.
+
+PILCanvas draws into PIL images, for headless rendering and export,
+and imports Pillow only when one is made.
+SurfaceCanvas draws straight into pygame Surfaces, so the GUI can blit
+the board without converting a full frame through bytes.  Both take
+canvas coordinates relative to the image they draw into, and keep
+rendered text in a bounded cache, starting with the gem counts.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pygame
+if TYPE_CHECKING:  # Pillow loads with the first PILCanvas, off the GUI's path
+    from PIL import Image
+
+from Splendor.Play.render import Coord, Rect, FONT_PATH
+from Splendor.Play.render.cache import LRUCache
+
+
+WHITE = (255, 255, 255)
+TEXT_CACHE_SIZE = 128  # Rendered strings per backend
+COUNTS = [str(n) for n in range(11)]  # Board and spend gem counts, pre-rendered
+
+
+class PILCanvas:
+    def __init__(self, font_size: int = 60):
+        from PIL import ImageFont
+        self.font = ImageFont.truetype(FONT_PATH, font_size)
+        self._texts = LRUCache(TEXT_CACHE_SIZE)
+        for text in COUNTS:
+            self._rendered(text, WHITE)
+
+    def new(self, size: Coord, alpha: bool = False) -> "Image.Image":
+        from PIL import Image
+        return Image.new("RGBA", size, (0, 0, 0, 0)) if alpha else Image.new("RGB", size)
+
+    def load(self, path: Path, target: Coord, alpha: bool = False) -> "Image.Image":
+        from PIL import Image
+        img = Image.open(path)
+        img = img.convert("RGBA" if alpha else "RGB")
+        return img.resize((target.x, target.y), Image.Resampling.BILINEAR)
+
+    def load_page(self, path: Path, alpha: bool) -> "Image.Image":
+        from PIL import Image
+        return Image.open(path).convert("RGBA" if alpha else "RGB")
+
+    def slice(self, page: "Image.Image", box: tuple[int, int, int, int]) -> "Image.Image":
+        return page.crop(box)
+
+    def crop(self, image: "Image.Image", rect: Rect) -> "Image.Image":
+        return image.crop(rect)
+
+    def copy(self, image: "Image.Image") -> "Image.Image":
+        return image.copy()
+
+    def paste(self, dst: "Image.Image", src: "Image.Image", xy: tuple[int, int]) -> None:
+        dst.paste(src, xy, src if src.mode == "RGBA" else None)
+
+    def composite(self, dst: "Image.Image", src: "Image.Image", xy: tuple[int, int]) -> None:
+        """Paste keeping transparency, for building alpha sprites."""
+        dst.alpha_composite(src, xy)
+
+    def _rendered(self, text: str, color: tuple) -> tuple["Image.Image", "Image.Image"]:
+        """(fill, coverage mask) of text drawn at the origin."""
+        key = (text, color)
+        rendered = self._texts.get(key)
+        if rendered is None:
+            from PIL import Image, ImageDraw
+            _, _, right, bottom = self.font.getbbox(text)
+            mask = Image.new("L", (max(right, 1), max(bottom, 1)))
+            ImageDraw.Draw(mask).text((0, 0), text, fill=255, font=self.font)
+            rendered = self._texts[key] = (Image.new("RGB", mask.size, color), mask)
+        return rendered
+
+    def text(self, dst: "Image.Image", xy: tuple[int, int], text: str) -> None:
+        fill, mask = self._rendered(text, WHITE)
+        dst.paste(fill, xy, mask)
+
+    def save(self, image: "Image.Image", buf) -> None:
+        image.save(buf, format="PNG")
+
+    @staticmethod
+    def nbytes(image: "Image.Image") -> int:
+        return image.width * image.height * len(image.getbands())
+
+
+class SurfaceCanvas:
+    def __init__(self, font_size: int = 60):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self.font = pygame.font.Font(str(FONT_PATH), font_size)
+        self._texts = LRUCache(TEXT_CACHE_SIZE)
+        for text in COUNTS:
+            self._rendered(text, WHITE)
+
+    @staticmethod
+    def _converted(surface: pygame.Surface, alpha: bool) -> pygame.Surface:
+        """Match the display format when there is one, so blits
+        don't convert pixels every time.
+        """
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def new(self, size: Coord, alpha: bool = False) -> pygame.Surface:
+        return self._converted(pygame.Surface(size, pygame.SRCALPHA if alpha else 0), alpha)
+
+    def load(self, path: Path, target: Coord, alpha: bool = False) -> pygame.Surface:
+        img = pygame.image.load(str(path))
+        img = pygame.transform.smoothscale(img, (target.x, target.y))
+        return self._converted(img, alpha)
+
+    def load_page(self, path: Path, alpha: bool) -> pygame.Surface:
+        return self._converted(pygame.image.load(str(path)), alpha)
+
+    def slice(self, page: pygame.Surface, box: tuple[int, int, int, int]) -> pygame.Surface:
+        x0, y0, x1, y1 = box
+        return page.subsurface((x0, y0, x1 - x0, y1 - y0))
+
+    def crop(self, image: pygame.Surface, rect: Rect) -> pygame.Surface:
+        return image.subsurface(rect.to_pygame()).copy()
+
+    def copy(self, image: pygame.Surface) -> pygame.Surface:
+        return image.copy()
+
+    def paste(self, dst: pygame.Surface, src: pygame.Surface, xy: tuple[int, int]) -> None:
+        dst.blit(src, xy)
+
+    def composite(self, dst: pygame.Surface, src: pygame.Surface, xy: tuple[int, int]) -> None:
+        """Paste keeping transparency, for building alpha sprites."""
+        dst.blit(src, xy)
+
+    def _rendered(self, text: str, color: tuple) -> pygame.Surface:
+        key = (text, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = self._texts[key] = self.font.render(text, True, color)
+        return surface
+
+    def text(self, dst: pygame.Surface, xy: tuple[int, int], text: str) -> None:
+        dst.blit(self._rendered(text, WHITE), xy)
+
+    def save(self, image: pygame.Surface, buf) -> None:
+        pygame.image.save(image, buf, "board.png")
+
+    @staticmethod
+    def nbytes(image: pygame.Surface) -> int:
+        return image.get_width() * image.get_height() * image.get_bytesize()
+
+
+CANVASES = {"pil": PILCanvas, "pygame": SurfaceCanvas}
@@ -0,0 +1,79 @@
+# Splendor/RL/chance.py
+"""Chance model for random deck draws, for search over the engine.
+
+Buying or reserving a shop card refills the slot from the deck and a
+blind reserve takes the top card; from the mover's point of view each
+is a uniform draw over the tier cards they can't see.  Every card in
+the box is distinct, so the outcomes are the unseen cards themselves.
+"""
+
+import numpy as np
+
+from Splendor.Environment.batched_game import BatchedGame, draw_slots
+
+
+class ChanceModel:
+    def __init__(self, max_outcomes: int | None = None, cache_size: int = 4096, rng=None):
+        """max_outcomes=None expands every unseen card exactly,
+        otherwise draws are sampled down to at most max_outcomes
+        equally weighted cards.
+        """
+        self.max_outcomes = max_outcomes
+        self.cache_size = cache_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._cache: dict[tuple[int, bytes], tuple[np.ndarray, np.ndarray]] = {}
+
+    def distribution(self, unseen: np.ndarray, tier: int) -> tuple[np.ndarray, np.ndarray]:
+        """Exact (card ids, probabilities), cached per (tier, unseen set)."""
+        key = (tier, unseen.tobytes())
+        if key not in self._cache:
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            probs = np.full(len(unseen), 1 / max(len(unseen), 1))
+            self._cache[key] = (unseen, probs)
+        return self._cache[key]
+
+    def outcomes(self, games: BatchedGame, i: int, tier: int, viewer: int):
+        """Cards the next draw of a tier could be, as seen by viewer."""
+        ids, probs = self.distribution(games.unseen(i, tier, viewer), tier)
+        if self.max_outcomes is None or len(ids) <= self.max_outcomes:
+            return ids, probs
+
+        picked = self.rng.choice(len(ids), self.max_outcomes, replace=False)
+        return ids[picked], np.full(self.max_outcomes, 1 / self.max_outcomes)
+
+    def expand(self, games: BatchedGame, legal: np.ndarray | None = None, rng=np.random):
+        """BatchedGame.expand with chance nodes resolved: each move
+        that draws a card fans out into one child per outcome.
+
+        Returns (parent, moves, probs, children); the probabilities
+        of the children of one (parent, move) pair sum to 1.
+        """
+        if legal is None:
+            legal = games.legal_moves()
+        parent, moves = np.nonzero(legal)
+        tier, _, _ = draw_slots(moves)
+        draws = (tier >= 0) & (games.deck_len[parent, np.maximum(tier, 0)] > 0)
+
+        # One row per outcome
+        repeats = np.ones(len(moves), dtype=int)
+        forced, probs = [], []
+        viewer = games.active
+        for row in range(len(moves)):
+            if draws[row]:
+                ids, p = self.outcomes(games, parent[row], tier[row], viewer[parent[row]])
+                repeats[row] = len(ids)
+                forced.append(ids)
+                probs.append(p)
+            else:
+                forced.append(np.zeros(1, dtype=int))
+                probs.append(np.ones(1))
+
+        rows = np.repeat(np.arange(len(moves)), repeats)
+        cards = np.concatenate(forced)
+        children = games.take(parent[rows])
+        chance_rows = np.flatnonzero(draws[rows])
+        if chance_rows.size:
+            children.force_top(chance_rows, tier[rows][chance_rows], cards[chance_rows])
+        children.step(moves[rows], rng)
+        return parent[rows], moves[rows], np.concatenate(probs), children
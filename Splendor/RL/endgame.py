@@ -0,0 +1,222 @@
+# Splendor/RL/endgame.py
+"""Alpha-beta endgame solver over one deck determinization.
+
+Close to 15 points the game usually ends within a few plies, so a
+shallow full-width search can prove who wins where MCTS would need
+many more nodes.  Leaves past the depth limit are scored by the value
+head; wins are scored above anything it outputs, sooner wins higher.
+
+Proofs never rest on chance.  A move that draws a card or owes random
+discards is scored by the value head rather than searched past, and so
+is a position where the opponent holds blind reserves, whose moves the
+solver can't know.  A proven win therefore holds for every deal.  The
+unseen cards (deck and blind reserves) are still shuffled once per
+solve, for the positions the value head scores.
+
+A solve can be spread over several calls: calls on the same position
+pick up where the last one stopped, so the GUI can run it in per-frame
+slices like the rest of the search.
+"""
+
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from Splendor.Environment.batched_game import BatchedGame, ACTION_TAKE, BUY_DIM, TAKE_DIM, draw_slots
+from Splendor.Environment.Splendor_components.Board_components.deck import CARD_TIERS
+from Splendor.RL.transposition import TranspositionTable
+
+
+class SolveResult(NamedTuple):
+    move: int
+    score: float        # from the mover's perspective
+    depth: int          # deepest fully searched depth
+    nodes: int
+    evaluations: int
+    elapsed_ms: float
+    solved: bool        # score is a proven win or loss
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class EndgameSolver:
+    def __init__(
+            self,
+            model,
+            max_nodes: int = 5000,
+            max_depth: int = 6,
+            tt: TranspositionTable | None = None,
+            win_score: float = 1000.0,
+            seed: int | None = None
+        ):
+        self.model = model
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.tt = tt if tt is not None else TranspositionTable(4.0)
+        self.win_score = win_score
+        self.rng = np.random.default_rng(seed)
+        self.nodes = 0
+        self.evaluations = 0
+        self._deadline = np.inf
+
+        # Progress on the current position, kept between calls
+        self._position: bytes | None = None
+        self._game: BatchedGame | None = None
+        self._viewer = 0  # Seat to move at the root
+        self._best: tuple | None = None  # (move, score, depth)
+        self._depth = 1
+        self._elapsed_ms = 0.0
+        self.finished = False  # Nothing left to search for this position
+
+    def determinize(self, game: BatchedGame) -> BatchedGame:
+        """Copy of game with the cards its player to move can't see,
+        each deck and the opponent's blind reserves, dealt again.
+        """
+        game = game.take([0])
+        opp = 1 - game.active[0]
+        blind = np.flatnonzero(game.reserved_hidden[0, opp])
+        for tier in range(3):
+            slots = blind[CARD_TIERS[game.reserved[0, opp, blind]] == tier]
+            n = game.deck_len[0, tier]
+            unseen = self.rng.permutation(np.concatenate((game.reserved[0, opp, slots], game.decks[0, tier, :n])))
+            game.reserved[0, opp, slots] = unseen[:len(slots)]
+            game.decks[0, tier, :n] = unseen[len(slots):]
+        return game
+
+    @staticmethod
+    def chance_moves(game: BatchedGame, moves: np.ndarray) -> np.ndarray:
+        """Which of game's moves have a sampled outcome: a deck draw,
+        or discards picked at random once the hand passes 10 gems.
+        """
+        tier, _, _ = draw_slots(moves)
+        draws = (tier >= 0) & (game.deck_len[0, np.maximum(tier, 0)] > 0)
+        held = game.gems[0, game.active[0]].sum()
+        taken = np.where(moves < TAKE_DIM - 1, ACTION_TAKE[np.minimum(moves, TAKE_DIM - 1)].sum(axis=1), 0)
+        gold = (moves >= TAKE_DIM + BUY_DIM) & (game.board_gems[0, 5] > 0)
+        return draws | (held + taken + gold > 10) | (moves == TAKE_DIM - 1)
+
+    def _to_table(self, score: float, ply: int) -> float:
+        """Win scores count plies from the root; the table keeps them
+        from the node, so they hold at whatever ply it comes up again.
+        """
+        if abs(score) >= self.win_score - self.max_depth:
+            return score + np.sign(score) * ply
+        return score
+
+    def _from_table(self, score: float, ply: int) -> float:
+        if abs(score) >= self.win_score - self.max_depth:
+            return score - np.sign(score) * ply
+        return score
+
+    def solve(self, game, deadline_ms: float | None = None) -> SolveResult | None:
+        """Iterative deepening until a win is proven, max_depth is
+        reached or the node limit runs out; the deadline pauses it.
+        A call on the position of the last one resumes that solve,
+        and returns at once when it is finished.  Returns None if not
+        even depth 1 finished.
+        """
+        start = time.perf_counter()
+        self._deadline = np.inf if deadline_ms is None else start + deadline_ms / 1000
+        if not isinstance(game, BatchedGame):
+            game = BatchedGame.from_game(game)
+        position = game.to_state()[0].tobytes()
+        if position != self._position:
+            self._position = position
+            self._game = self.determinize(game)
+            self._viewer = int(game.active[0])
+            self.tt.clear()  # Entries only hold for one determinization
+            self.nodes = self.evaluations = 0
+            self._best = None
+            self._depth = 1
+            self._elapsed_ms = 0.0
+            self.finished = False
+
+        while not self.finished:
+            try:
+                score, move = self._negamax(self._game, self._depth, -np.inf, np.inf, 0)
+            except _OutOfBudget:
+                self.finished = self.nodes > self.max_nodes
+                break
+            self._best = (move, score, self._depth)
+            won = abs(score) >= self.win_score - self.max_depth
+            self.finished = won or move is None or self._depth == self.max_depth
+            self._depth += 1
+        self._elapsed_ms += (time.perf_counter() - start) * 1000
+        if self._best is None or self._best[0] is None:
+            return None
+
+        move, score, depth = self._best
+        solved = abs(score) >= self.win_score - self.max_depth
+        return SolveResult(int(move), float(score), depth, self.nodes, self.evaluations, self._elapsed_ms, solved)
+
+    def _negamax(self, game: BatchedGame, depth: int, alpha: float, beta: float, ply: int):
+        """(score, best move) for the player to move in game."""
+        self.nodes += 1
+        if self.nodes > self.max_nodes or time.perf_counter() > self._deadline:
+            raise _OutOfBudget
+
+        state = game.to_state()
+        mover = game.active[0]
+        if mover != self._viewer and game.reserved_hidden[0, mover].any():
+            self.evaluations += 1
+            return float(self.model.get_values(state)[0]), None
+
+        key = self.tt.hash(state)
+        hit, cached, cached_depth, cached_move = self.tt.probe(key)
+        if hit[0] and cached_depth[0] > depth:  # Exact entries store depth + 1
+            return self._from_table(float(cached[0]), ply), int(cached_move[0])
+
+        moves = np.flatnonzero(game.legal_moves()[0])
+        if moves.size == 0:
+            return 0.0, None
+        children = game.repeat(len(moves))
+        children.step(moves, self.rng)
+
+        won = np.flatnonzero(children.done)
+        if won.size:
+            score = self.win_score - ply
+            self.tt.store(key, self._to_table(score, ply), self.max_depth + 1, moves[won[0]])
+            return score, int(moves[won[0]])
+
+        if depth == 1:
+            values = -self.model.get_values(children.to_state())
+            self.evaluations += len(moves)
+            j = int(np.argmax(values))
+            self.tt.store(key, values[j], 2, moves[j])
+            return float(values[j]), int(moves[j])
+
+        # Sampled outcomes end the line at the value head
+        chance = self.chance_moves(game, moves)
+        leaf_values = np.zeros(len(moves))
+        if chance.any():
+            leaf_values[chance] = -self.model.get_values(children.take(np.flatnonzero(chance)).to_state())
+            self.evaluations += int(chance.sum())
+
+        # Q-value ordering, previous best move first
+        order = np.argsort(-self.model._forward(state[0])[moves])
+        self.evaluations += 1
+        if hit[0] and cached_move[0] in moves:
+            first = np.flatnonzero(moves == cached_move[0])[0]
+            order = np.concatenate([[first], order[order != first]])
+
+        alpha_in = alpha
+        best_score, best_move = -np.inf, int(moves[order[0]])
+        for j in order:
+            if chance[j]:
+                score = leaf_values[j]
+            else:
+                score, _ = self._negamax(children.take([j]), depth - 1, -beta, -alpha, ply + 1)
+                score = -score
+            if score > best_score:
+                best_score, best_move = score, int(moves[j])
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        # Bounds only help move ordering; exact scores can be reused
+        exact = alpha_in < best_score < beta
+        self.tt.store(key, self._to_table(best_score, ply), depth + 1 if exact else 0, best_move)
+        return best_score, best_move
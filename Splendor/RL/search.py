@@ -0,0 +1,500 @@
+# Splendor/RL/search.py
+"""Anytime tree search over the batched engine.
+
+Each expansion applies every legal move of a leaf in one vectorized
+step (deck draws sampled from the unseen cards by the ChanceModel) and
+scores all children with one batched pass through the value head,
+which also yields the leaf's priors.
+Selection is PUCT with priors from the action head's q-values.  The
+search can stop at any point and always has a best move ready.
+
+The tree is kept between calls: when the game reaches a position the
+tree already holds (the reply to a move it pondered), that subtree
+becomes the new root and its statistics carry over.
+
+Two kinds of parallelism: batch_size > 1 collects several leaves per
+pass under virtual loss and expands them with one network call, and
+RootParallelSearch runs independent trees in worker processes and
+merges their root visits as votes.
+"""
+
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:  # No processes in the browser build
+    ProcessPoolExecutor = None
+
+from Splendor.Environment.batched_game import BatchedGame, N_ACTIONS
+from Splendor.RL.chance import ChanceModel
+from Splendor.RL.endgame import EndgameSolver
+from Splendor.RL.transposition import TranspositionTable
+
+
+class SearchResult(NamedTuple):
+    move: int
+    nodes: int          # expansions, including the root
+    evaluations: int    # positions scored by the network
+    elapsed_ms: float
+
+    @property
+    def evals_per_sec(self) -> float:
+        return self.evaluations / max(self.elapsed_ms / 1000, 1e-9)
+
+
+# Node budgets fix what a tier costs however loaded the machine is;
+# the deadline only caps latency.  0 nodes is the raw argmax q move
+# and 1 node is the 1-ply value lookahead.
+DIFFICULTY_TIERS = {
+    "easy":   dict(max_nodes=0,   deadline_ms=50),
+    "medium": dict(max_nodes=1,   deadline_ms=200),
+    "hard":   dict(max_nodes=64,  deadline_ms=1500),
+    "expert": dict(max_nodes=512, deadline_ms=6000),
+}
+# Tree size pondering stops at for budgets without a node limit
+PONDER_NODES = 4 * DIFFICULTY_TIERS["expert"]["max_nodes"]
+
+
+class Node:
+    """One expanded position; edge statistics live in arrays."""
+    __slots__ = ("state", "children", "moves", "prior", "value", "terminal", "visits", "total", "nodes")
+
+    def __init__(self, state, children: BatchedGame, moves, prior, value, terminal):
+        self.state = state          # (251,) encoding, to recognize the position
+        self.children = children    # successor games, one per edge
+        self.moves = moves          # (k,) legal move indices
+        self.prior = prior          # (k,) softmaxed q-values
+        self.value = value          # (k,) network estimate, mover's view
+        self.terminal = terminal    # (k,) edge wins the game
+        self.visits = np.zeros(len(moves), dtype=int)
+        self.total = np.zeros(len(moves))
+        self.nodes: dict[int, "Node | None"] = {}  # None if stuck
+
+    def q(self) -> np.ndarray:
+        visited = self.visits > 0
+        return np.where(visited, self.total / np.maximum(self.visits, 1), self.value)
+
+    def best_edge(self) -> int:
+        """Most visited edge, ties broken by value."""
+        return int(np.lexsort((self.q(), self.visits))[-1])
+
+
+class MCTS:
+    def __init__(
+            self,
+            model,
+            chance: ChanceModel | None = None,
+            c_puct: float = 1.5,
+            win_value: float = 16.0,
+            batch_size: int = 1,
+            virtual_loss: float = 3.0,
+            tt: TranspositionTable | None = None
+        ):
+        """win_value scores a winning edge and should sit above
+        anything the value head outputs.  batch_size leaves are
+        expanded per pass; virtual_loss (in value units) steers the
+        paths of one pass apart.  Children found in tt skip the
+        value head.
+        """
+        self.model = model
+        self.chance = chance if chance is not None else ChanceModel(max_outcomes=1)
+        self.c_puct = c_puct
+        self.win_value = win_value
+        self.batch_size = batch_size
+        self.virtual_loss = virtual_loss
+        self.tt = tt
+        self.evaluations = 0
+        self.root: Node | None = None
+        # Running mean and deviation of what one expansion costs, to
+        # stop before a deadline rather than after it
+        self.node_ms = 0.0
+        self.node_dev_ms = 0.0
+
+    def expand(self, game: BatchedGame) -> Node | None:
+        """Score every legal successor of a single game at once."""
+        return self.expand_many(game)[0]
+
+    def expand_many(self, games: BatchedGame) -> list[Node | None]:
+        """expand() for a batch of games, with one network call for
+        their priors and the children's values.
+        """
+        legal = games.legal_moves()
+        nodes: list[Node | None] = [None] * len(games)
+        stuck = ~legal.any(axis=1)
+        if stuck.all():
+            return nodes
+
+        states = games.to_state()
+        parent, moves, _, children = self.chance.expand(games, legal)
+        terminal = children.done
+        q, value = self.evaluate(states, children.to_state(), skip=terminal)
+        value = -value
+        value[terminal] = self.win_value
+
+        bounds = np.searchsorted(parent, np.arange(len(games) + 1))
+        for i in np.flatnonzero(~stuck):
+            lo, hi = bounds[i], bounds[i + 1]
+            prior = np.exp(q[i, moves[lo:hi]] - q[i, moves[lo:hi]].max())
+            nodes[i] = Node(
+                states[i], children.take(np.arange(lo, hi)), moves[lo:hi],
+                prior / prior.sum(), value[lo:hi], terminal[lo:hi]
+            )
+        return nodes
+
+    def evaluate(self, states: np.ndarray, child_states: np.ndarray, skip) -> tuple[np.ndarray, np.ndarray]:
+        """(q-values of states, values of child_states) from one
+        network call.  Children in the transposition table, if there
+        is one, are left out of it, and rows in skip are left at 0.
+        """
+        todo = ~skip
+        if self.tt is not None:
+            keys = self.tt.hash(child_states[todo])
+            hit, cached, _, _ = self.tt.probe(keys)
+            rows = np.flatnonzero(todo)
+            todo[rows[hit]] = False
+
+        values = np.zeros(len(child_states))
+        q, values[todo] = self.model.evaluate(states, child_states[todo])
+        self.evaluations += len(states) + int(todo.sum())
+        if self.tt is not None:
+            values[rows[hit]] = cached[hit]
+            self.tt.store(keys[~hit], values[rows[~hit]], 0, -1)
+        return q, values
+
+    def reroot(self, game: BatchedGame) -> Node | None:
+        """Make the subtree for game's position the root if the tree
+        reaches it within two plies, and drop the rest of the tree.
+        """
+        state = game.to_state()[0]
+        level = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in level:
+                if np.array_equal(node.state, state):
+                    self.root = node
+                    return node
+            level = [child for node in level for child in node.nodes.values() if child is not None]
+
+        self.root = None
+        return None
+
+    def select(self, node: Node) -> int:
+        # Values span ~15 points, so rescale q to [0, 1] per node
+        q = node.q()
+        low, high = q.min(), q.max()
+        q = (q - low) / (high - low) if high > low else np.zeros_like(q)
+        explore = self.c_puct * node.prior * np.sqrt(node.visits.sum() + 1) / (1 + node.visits)
+        return int(np.argmax(q + explore))
+
+    def descend(self, root: Node) -> tuple[list[tuple[Node, int]], float | None]:
+        """Select a path from the root.  The value is None if the path
+        ends on an unexpanded edge, otherwise the last edge's value.
+        """
+        node, path = root, []
+        while True:
+            edge = self.select(node)
+            path.append((node, edge))
+            if node.terminal[edge]:
+                return path, self.win_value
+            if edge not in node.nodes:
+                return path, None
+            child = node.nodes[edge]
+            if child is None:  # Stuck position
+                return path, 0.0
+            node = child
+
+    def _add(self, path, visits: int, value: float) -> None:
+        """Add visits and value along a path, flipping perspective
+        every ply from the last edge up.
+        """
+        for node, edge in reversed(path):
+            node.visits[edge] += visits
+            node.total[edge] += value
+            value = -value
+
+    def simulate(self, root: Node, n_paths: int = 1) -> int:
+        """Selection/expansion/backup for up to n_paths paths, with
+        every new leaf expanded in one batch.  Paths are held apart by
+        virtual loss; a path onto a leaf already being expanded ends
+        the collection.  Returns the number of nodes expanded.
+        """
+        paths, leaves = [], {}
+        for _ in range(n_paths):
+            path, value = self.descend(root)
+            node, edge = path[-1]
+            if value is None:
+                if (id(node), edge) in leaves:
+                    break
+                leaves[id(node), edge] = len(paths)
+            paths.append((path, value))
+            if n_paths > 1:
+                self._add(path, 1, -self.virtual_loss)
+
+        # Expand the new leaves together
+        new = [(path[-1], i) for i, (path, value) in enumerate(paths) if value is None]
+        if new:
+            games = BatchedGame.concat([node.children.take([edge]) for (node, edge), _ in new])
+            for ((node, edge), i), child in zip(new, self.expand_many(games)):
+                node.nodes[edge] = child
+                paths[i] = (paths[i][0], 0.0 if child is None else -child.value.max())
+
+        for path, value in paths:
+            if n_paths > 1:
+                self._add(path, -1, self.virtual_loss)
+            self._add(path, 1, value)
+        return len(new)
+
+    def _time_node(self, ms: float) -> None:
+        if not self.node_ms:
+            self.node_ms = ms
+            return
+        self.node_dev_ms += 0.2 * (abs(ms - self.node_ms) - self.node_dev_ms)
+        self.node_ms += 0.2 * (ms - self.node_ms)
+
+    def search(self, game, max_nodes: int | None = None, deadline_ms: float | None = None) -> SearchResult:
+        """Search a GUIGame or single BatchedGame until the node
+        budget or the deadline runs out, whichever comes first.  At
+        least one of them must be given.
+        """
+        if max_nodes is None and deadline_ms is None:
+            raise ValueError("MCTS.search needs max_nodes or deadline_ms")
+        start = time.perf_counter()
+        deadline = np.inf if deadline_ms is None else start + deadline_ms / 1000
+        if not isinstance(game, BatchedGame):
+            game = BatchedGame.from_game(game)
+        self.evaluations = 0
+
+        def result(move: int, nodes: int) -> SearchResult:
+            elapsed = (time.perf_counter() - start) * 1000
+            return SearchResult(int(move), nodes, self.evaluations, elapsed)
+
+        def raw_move() -> int:
+            self.evaluations += 1
+            q = self.model._forward(game.to_state()[0])
+            q[~game.legal_moves()[0]] = -np.inf
+            return int(np.argmax(q))
+
+        if max_nodes == 0 or time.perf_counter() >= deadline:
+            return result(raw_move(), 0)
+
+        nodes = 0
+        root = self.reroot(game)
+        if root is None:
+            root = self.root = self.expand(game)
+            if root is None:
+                return result(raw_move(), 0)
+            nodes = 1
+
+        # The budget is the size of the tree under the root, so
+        # statistics from pondering count towards it.  A pass only
+        # starts if it should finish before the deadline, so short
+        # slices don't overrun by a whole pass
+        while max_nodes is None or root.visits.sum() + 1 < max_nodes:
+            n_paths = self.batch_size
+            if max_nodes is not None:
+                n_paths = min(n_paths, max_nodes - 1 - root.visits.sum())
+            now = time.perf_counter()
+            if now + n_paths * (self.node_ms + 2 * self.node_dev_ms) / 1000 >= deadline:
+                break
+            expanded = self.simulate(root, n_paths)
+            if expanded:
+                self._time_node((time.perf_counter() - now) * 1000 / expanded)
+            nodes += expanded
+
+        if root.visits.any():
+            edge = root.best_edge()
+        else:
+            edge = int(np.argmax(root.value))
+        best = root.moves[edge]
+
+        # Keep the searched value for when the position comes up again
+        if self.tt is not None and root.visits.any():
+            key = self.tt.hash(root.state[None])
+            self.tt.store(key, root.q()[edge], root.visits.sum(), best)
+
+        return result(best, nodes)
+
+
+# Root parallelism: one MCTS per worker process, kept between calls
+# so each worker reuses its own subtree
+_worker_mcts: MCTS | None = None
+
+
+def _init_worker(model, mcts_kwargs: dict) -> None:
+    global _worker_mcts
+    np.random.seed()  # Forked workers would otherwise share discard draws
+    _worker_mcts = MCTS(model, ChanceModel(max_outcomes=1), **mcts_kwargs)
+
+
+def _worker_search(game: BatchedGame, max_nodes, deadline_ms):
+    mcts = _worker_mcts
+    assert mcts is not None, "worker not initialized"
+    result = mcts.search(game, max_nodes, deadline_ms)
+    root = mcts.root
+    if root is None or not root.visits.any():
+        return np.array([result.move]), np.ones(1), np.zeros(1), result
+    return root.moves, root.visits.copy(), root.q(), result
+
+
+class RootParallelSearch:
+    """Independent trees over the same position in worker processes,
+    merged by summing root visits per move.  Workers sample their own
+    deck draws, so the vote also averages over determinizations.
+    """
+    def __init__(self, model, workers: int, **mcts_kwargs):
+        if ProcessPoolExecutor is None:
+            raise RuntimeError("Root-parallel search needs process support")
+        self.workers = workers
+        self._pool = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(model, mcts_kwargs)
+        )
+
+    def search(self, game, max_nodes: int | None = None, deadline_ms: float | None = None) -> SearchResult:
+        """MCTS.search with max_nodes and deadline_ms per worker."""
+        if max_nodes is None and deadline_ms is None:
+            raise ValueError("RootParallelSearch.search needs max_nodes or deadline_ms")
+        start = time.perf_counter()
+        if not isinstance(game, BatchedGame):
+            game = BatchedGame.from_game(game)
+
+        futures = [
+            self._pool.submit(_worker_search, game, max_nodes, deadline_ms)
+            for _ in range(self.workers)
+        ]
+        votes = np.zeros(N_ACTIONS)
+        q_sum = np.zeros(N_ACTIONS)
+        nodes = evaluations = 0
+        for future in futures:
+            moves, visits, q, result = future.result()
+            votes[moves] += visits
+            q_sum[moves] += q
+            nodes += result.nodes
+            evaluations += result.evaluations
+
+        voted = np.flatnonzero(votes == votes.max())
+        best = voted[np.argmax(q_sum[voted])]
+        elapsed = (time.perf_counter() - start) * 1000
+        return SearchResult(int(best), nodes, evaluations, elapsed)
+
+    def reroot(self, game) -> None:
+        """Workers reroot themselves on their next search."""
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+
+class SearchAgent:
+    """Agent slot for GUIGame that picks moves by MCTS at a
+    difficulty tier, or a custom node budget and deadline.
+
+    ponder() grows the tree on the opponent's turn in small time
+    slices, up to ponder_nodes (default 4x the tier's budget, or
+    PONDER_NODES without one), so the reply to whatever they play is
+    mostly searched already.  A custom budget needs max_nodes or
+    deadline_ms.
+
+    workers > 1 searches root-parallel in that many processes (call
+    close() when done); batch_size sets leaf batching in each tree.
+    tt_mb sizes a transposition table for MCTS, 0 for none.  With
+    draws sampled per expansion few children repeat, so it is off by
+    default; the endgame solver keeps its own.
+
+    Once either player is within endgame_points of 15, moves come
+    from the alpha-beta EndgameSolver whenever it proves a win within
+    endgame_nodes, and from MCTS otherwise, with what is left of the
+    same deadline.  The solver never counts on a draw, so its wins
+    hold however the cards come out.  None turns the
+    solver off; tiers without search never use it.  Pondering on the
+    agent's own turn gives the solver what MCTS leaves of each slice,
+    and a solve pondered that way gets no more time when the move is
+    made, so per-frame budgets never block on it.
+    """
+    def __init__(
+            self,
+            model,
+            tier: str = "hard",
+            ponder_nodes: int | None = None,
+            workers: int = 1,
+            batch_size: int = 1,
+            tt_mb: float = 0.0,
+            endgame_points: int | None = 3,
+            endgame_nodes: int = 5000,
+            **budget
+        ):
+        self.model = model
+        self.endgame_points = endgame_points
+        self.endgame = EndgameSolver(model, max_nodes=endgame_nodes)
+        tt = TranspositionTable(tt_mb) if tt_mb else None
+        if workers > 1:
+            self.mcts = RootParallelSearch(model, workers, batch_size=batch_size, tt=tt)
+        else:
+            self.mcts = MCTS(model, batch_size=batch_size, tt=tt)
+        self.budget = {**DIFFICULTY_TIERS[tier], **budget}
+        max_nodes = self.budget["max_nodes"]
+        if max_nodes is None and self.budget["deadline_ms"] is None:
+            raise ValueError("SearchAgent budget needs max_nodes or deadline_ms")
+        if ponder_nodes is None:
+            ponder_nodes = PONDER_NODES if max_nodes is None else 4 * max_nodes
+        self.ponder_nodes = ponder_nodes
+        self.last_result: SearchResult | None = None
+        self._sliced: bytes | None = None  # Position whose solve was pondered
+
+    def select_move(self, game) -> int:
+        if not isinstance(game, BatchedGame):
+            game = BatchedGame.from_game(game)
+
+        # One deadline for the whole move, solver and MCTS together
+        start = time.perf_counter()
+        deadline_ms = self.budget["deadline_ms"]
+        if self._in_endgame(game):
+            pondered = self._sliced == game.to_state()[0].tobytes()
+            solved = self.endgame.solve(game, 0 if pondered else deadline_ms)
+            if solved is not None and solved.solved and solved.score > 0:
+                self.last_result = SearchResult(
+                    solved.move, solved.nodes, solved.evaluations, solved.elapsed_ms
+                )
+                return solved.move
+            if deadline_ms is not None:
+                deadline_ms = max(deadline_ms - (time.perf_counter() - start) * 1000, 0)
+
+        self.last_result = self.mcts.search(game, self.budget["max_nodes"], deadline_ms)
+        return self.last_result.move
+
+    def _in_endgame(self, game: BatchedGame) -> bool:
+        if self.endgame_points is None or self.budget["max_nodes"] == 0:
+            return False
+        return game.points.max() >= 15 - self.endgame_points
+
+    def ponder(self, game, budget_ms: float) -> int:
+        """Search from the current position for up to budget_ms.
+        On the agent's own turn this stops at the move's budget, and
+        in the endgame the solver gets what is left of each slice
+        until it finishes.  Returns the number of nodes expanded.
+        """
+        if self.budget["max_nodes"] == 0:  # Tiers without search
+            return 0
+        own_turn = getattr(game, "active_player", None) is not None and game.active_player.agent is self
+        if not own_turn:
+            return self.mcts.search(game, self.ponder_nodes, budget_ms).nodes
+
+        start = time.perf_counter()
+        if not isinstance(game, BatchedGame):
+            game = BatchedGame.from_game(game)
+        nodes = self.mcts.search(game, self.budget["max_nodes"], budget_ms).nodes
+        if self._in_endgame(game):
+            self._sliced = game.to_state()[0].tobytes()
+            before = self.endgame.nodes
+            self.endgame.solve(game, max(budget_ms - (time.perf_counter() - start) * 1000, 0))
+            if not self.endgame.finished:
+                nodes += max(self.endgame.nodes - before, 1)
+        return nodes
+
+    def advance(self, game) -> None:
+        """Follow a move made in game, keeping the matching subtree."""
+        self.mcts.reroot(BatchedGame.from_game(game))
+
+    def close(self) -> None:
+        if isinstance(self.mcts, RootParallelSearch):
+            self.mcts.close()
@@ -0,0 +1,200 @@
+# Splendor/benchmarks.py
+"""Micro-benchmarks for the engine's hot paths.
+
+Run from the repo root:
+    python -m Splendor.benchmarks [benchmark ...] [--model PATH] [--workers N ...]
+"""
+
+import gc
+import os
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from Splendor.Environment.gui_game import GUIGame
+from Splendor.Environment.Splendor_components.Board_components import deck
+from Splendor.Play.common_types import FocusTarget, GUIMove
+
+
+# Where the package keeps its trained weights (and webstage.py copies
+# them from), so this also holds in the vendored docs/Splendor
+MODEL_PATH = Path(__file__).resolve().parent / "RL" / "trained_agents" / "inference_model.npz"
+
+
+def _traced_bytes(build) -> tuple[int, object]:
+    """Net bytes allocated by build(), keeping its result alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def bench_domain(n_games: int = 1000, n_moves: int = 10_000) -> dict:
+    """Memory footprint and attribute access of the domain types."""
+    results = {}
+
+    # Card/Noble objects for the whole game box
+    nbytes, decks = _traced_bytes(deck._preload_decks)
+    results["card_box_bytes"] = nbytes
+    cards = [card for tier in (0, 1, 2) for card in decks[tier]]  # type: ignore
+
+    # Many live games (e.g. search snapshots)
+    players = [("A", None, 0), ("B", None, 1)]
+    nbytes, _ = _traced_bytes(lambda: [GUIGame(players, None) for _ in range(n_games)])
+    results["bytes_per_game"] = nbytes / n_games
+
+    # Per-frame GUI objects
+    take = np.zeros(6, dtype=int)
+    nbytes, _ = _traced_bytes(lambda: [
+        GUIMove("take", take=take, source=FocusTarget("shop", tier=0, pos=0))
+        for _ in range(n_moves)
+    ])
+    results["bytes_per_guimove"] = nbytes / n_moves
+
+    # Attribute-heavy inner loop
+    def touch():
+        for card in cards:
+            card.gem, card.points, card.tier, card.cost
+    reps = 2000
+    results["ns_per_card_access"] = (
+        min(timeit.repeat(touch, number=reps, repeat=5)) / (reps * len(cards)) * 1e9
+    )
+
+    # Legality and encoding, which read card attributes per card
+    game = GUIGame(players, None)
+    player = game.active_player
+    reps = 2000
+    results["us_per_legal_mask"] = (
+        min(timeit.repeat(lambda: player.get_legal_moves(game.board), number=reps, repeat=5))
+        / reps * 1e6
+    )
+    results["us_per_to_state"] = (
+        min(timeit.repeat(game.to_state, number=reps, repeat=5)) / reps * 1e6
+    )
+
+    return results
+
+
+def bench_search(
+        workers=None,
+        batch_sizes=(1, 8, 32),
+        deadline_ms: float = 1000
+    ) -> dict:
+    """Search throughput by leaf batch size, and root-parallel
+    scaling by worker count, on a mid-game position.  Workers
+    default to powers of two up to the core count; more workers than
+    cores only measure process overhead.
+
+    No worker scaling numbers ship with this: it has only been run on
+    a single-core host, so sizing hardware for 1-32 workers needs a
+    run of `search --workers 1 2 4 8 16 32` on a machine with that many cores.
+    """
+    if workers is None:
+        cores = os.cpu_count() or 1
+        workers = [1 << i for i in range(cores.bit_length())]
+    from Splendor.Environment.batched_game import BatchedGame
+    from Splendor.RL import InferenceModel, MCTS, RootParallelSearch
+
+    model = InferenceModel(str(MODEL_PATH))
+    game = GUIGame([("A", model, 0), ("B", model, 1)], None)
+    for _ in range(10):
+        game.turn()
+    root = BatchedGame.from_game(game)
+
+    results = {}
+    for batch_size in batch_sizes:
+        result = MCTS(model, batch_size=batch_size).search(root, deadline_ms=deadline_ms)
+        results[f"evals_per_sec_batch{batch_size}"] = result.evals_per_sec
+
+    for n in workers:
+        search = RootParallelSearch(model, n)
+        search.search(root, max_nodes=2)  # Start the workers
+        result = search.search(root, deadline_ms=deadline_ms)
+        search.close()
+        results[f"evals_per_sec_{n}_workers"] = result.evals_per_sec
+        results[f"nodes_{n}_workers"] = result.nodes
+
+    return results
+
+
+def _replay(seed: int) -> list[int]:
+    """Moves of a seeded GUIGame between seeded HeuristicAgents."""
+    from Splendor.RL import HeuristicAgent
+
+    agents = HeuristicAgent(seed), HeuristicAgent(seed + 1)
+    game = GUIGame([("A", agents[0], 0), ("B", agents[1], 1)], None, seed=seed)
+    moves = []
+    while not game.victor and game.half_turns < 400:
+        game.turn()
+        moves.append(game.move_idx)
+    return moves
+
+
+def bench_heuristic(batch: int = 1024, n_replays: int = 5) -> dict:
+    """Cost of a HeuristicAgent move, alone and per game in a batch,
+    against one argmax-q move of the network.  Also replays n_replays
+    seeded games twice and fails if any move differs.
+    """
+    replayed = 0
+    for seed in range(n_replays):
+        moves = _replay(seed)
+        assert moves == _replay(seed), f"seed {seed} replayed differently"
+        replayed += len(moves)
+
+    from Splendor.Environment.batched_game import BatchedGame
+    from Splendor.RL import HeuristicAgent, InferenceModel
+
+    agent = HeuristicAgent(seed=0)
+    rng = np.random.default_rng(0)
+    single, games = BatchedGame.new(1, rng), BatchedGame.new(batch, rng)
+    legal = games.legal_moves()
+    reps = 200
+
+    model = InferenceModel(str(MODEL_PATH))
+    game = GUIGame([("A", model, 0), ("B", model, 1)], None)
+    player = game.active_player
+    return {
+        "us_per_move_single": min(timeit.repeat(
+            lambda: agent.select_moves(single), number=reps, repeat=5
+        )) / reps * 1e6,
+        "us_per_move_batched": min(timeit.repeat(
+            lambda: agent.select_moves(games, legal), number=10, repeat=5
+        )) / (10 * batch) * 1e6,
+        "us_per_model_move": min(timeit.repeat(
+            lambda: player.choose_move(game.board, game.to_state()), number=reps, repeat=5
+        )) / reps * 1e6,
+        "replayed_moves": replayed,
+    }
+
+
+BENCHMARKS = {
+    "domain": bench_domain,
+    "search": bench_search,
+    "heuristic": bench_heuristic,
+}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help=f"any of {', '.join(BENCHMARKS)}, default all")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help="inference_model.npz to load")
+    parser.add_argument("--workers", type=int, nargs="+", help="worker counts for the search benchmark")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+
+    MODEL_PATH = args.model
+    names = args.benchmarks or list(BENCHMARKS)
+    for name in names:
+        print(f"[{name}]")
+        kwargs = {"workers": args.workers} if name == "search" else {}
+        for key, value in BENCHMARKS[name](**kwargs).items():
+            print(f"  {key:<24} {value:,.1f}")
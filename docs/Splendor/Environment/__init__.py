@@ -1,3 +1,5 @@
 # Splendor/Environment/__init__.py
 
 from .Splendor_components import Board, Player
+from .batched_game import BatchedGame
+from .vector_env import VectorEnv
@@ -0,0 +1,95 @@
+# Splendor/Environment/vector_env.py
+"""Gymnasium-style vectorized self-play environment.
+
+Observations are the 251-dim GUIGame.to_state encoding from the
+perspective of the player to move, and each step takes one action per
+game for whoever is to move.  The reward goes to the player who just
+moved.  Finished games are reset in the same step; the terminal
+observation is kept in info["final_observation"].
+"""
+
+import numpy as np
+
+from Splendor.Environment.batched_game import BatchedGame, N_ACTIONS, STATE_DIM
+
+try:
+    from gymnasium import spaces
+except ImportError:  # gymnasium is optional, only used for space metadata
+    spaces = None
+
+
+class VectorEnv:
+    def __init__(
+            self,
+            num_envs: int,
+            max_half_turns: int = 200,
+            point_reward: float = 0.0
+        ):
+        """point_reward scales an optional dense reward of points
+        gained by the mover; the win itself is always worth 1.
+        """
+        self.num_envs = num_envs
+        self.max_half_turns = max_half_turns
+        self.point_reward = point_reward
+        self.rng = np.random.default_rng()
+        self.games: BatchedGame = BatchedGame.new(num_envs, self.rng)
+        self._mask = self.games.legal_moves()
+
+        if spaces is not None:
+            self.single_observation_space = spaces.Box(0.0, np.inf, (STATE_DIM,), np.float32)
+            self.single_action_space = spaces.Discrete(N_ACTIONS)
+            self.observation_space = spaces.Box(0.0, np.inf, (num_envs, STATE_DIM), np.float32)
+            self.action_space = spaces.MultiDiscrete([N_ACTIONS] * num_envs)
+
+    def reset(self, seed: int | None = None, options: dict | None = None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.games = BatchedGame.new(self.num_envs, self.rng)
+        self._mask = self.games.legal_moves()
+        return self.games.to_state(), {"action_mask": self._mask}
+
+    def action_masks(self) -> np.ndarray:
+        """(N, 141) legal moves for the player to move."""
+        return self._mask
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=int)
+        games = self.games
+        idx = np.arange(self.num_envs)
+        if not self._mask[idx, actions].all():
+            bad = np.flatnonzero(~self._mask[idx, actions])
+            raise ValueError(f"Illegal actions in envs {bad.tolist()}: {actions[bad].tolist()}")
+
+        mover = games.active
+        points_before = games.points[idx, mover]
+        games.step(actions, self.rng)
+        gained = games.points[idx, mover] - points_before
+
+        terminated = games.done.copy()
+        rewards = (terminated + self.point_reward * gained).astype(np.float32)
+
+        # Truncate on the turn limit or if the next player is stuck
+        obs = games.to_state()
+        mask = games.legal_moves()
+        truncated = ~terminated & (
+            (games.half_turns >= self.max_half_turns) | ~mask.any(axis=1)
+        )
+
+        info = {}
+        finished = terminated | truncated
+        if finished.any():
+            info["final_observation"] = obs.copy()
+            info["_final_observation"] = finished
+            info["final_points"] = games.points.copy()
+
+            rows = np.flatnonzero(finished)
+            games.assign(rows, BatchedGame.new(rows.size, self.rng))
+            obs[rows] = games.take(rows).to_state()
+            mask[rows] = games.take(rows).legal_moves()
+
+        self._mask = mask
+        info["action_mask"] = mask
+        return obs, rewards, terminated, truncated, info
+
+    def close(self) -> None:
+        pass
@@ -18,10 +18,6 @@ from Splendor.Play.render import (
 )
 
 
-def pil_to_surface(pil_image):
-    img = pil_image.convert("RGB")
-    return pygame.image.fromstring(img.tobytes(), img.size, "RGB")
-
 class UILock:
     """Block all UI clicks while AI is thinking and
     after each human move to allow the player to see
@@ -47,7 +43,7 @@ class SplendorGUI:
         self.game = game
         self.human = human
         self.overlay: OverlayRenderer
-        self._renderer = BoardRenderer()
+        self._renderer = BoardRenderer(backend="pygame")
         self.window = None
         self.running = True
 
@@ -55,10 +51,17 @@ class SplendorGUI:
         self._awaiting_ai = False
         self.delay_after_move: int = 1600
         self.lock = UILock(game, human)
+        self.ponder_ms: int = 8  # AI search per frame on the human's turn
+
+        # Idle frames: nothing is redrawn until the frame key changes
+        self.idle = False  # Last tick drew nothing and had nothing to ponder
+        self.idle_poll_ms: int = 50  # Longest wait for input when idle
+        self._dirty = True
+        self._last_frame_key = None
 
         # Caches
-        self._preview_state: tuple[FocusTarget | None, tuple[int, ...]] = (None, ())
-        self._preview_lines: list[str] = []
+        self._preview_state: tuple[int | None, FocusTarget | None] = (None, None)  # (scene stamp, focus)
+        self._preview_lines: list[tuple[str, GUIMove]] = []  # Card menu for _preview_state
 
         # State
         self._focus_target: FocusTarget | None = None
@@ -68,8 +71,10 @@ class SplendorGUI:
         self._spend_state = None  # Context for when player manually spends
         self._discard_state = False  # Flag for when reserving with 10 gems
 
-        self._base_frame = None  # pygame.Surface
+        self._base_frame = None  # pygame.Surface, redrawn in place by the renderer
         self._scene_stamp = None  # int: game.half_turns of last base draw
+        self._window_frame = None  # Base frame at window size
+        self._window_frame_key = None  # (scene stamp, window size) it was scaled for
 
         # Sound effects
         pygame.mixer.init(frequency=44100, channels=2, buffer=512)
@@ -127,7 +132,7 @@ class SplendorGUI:
 
     def _reserve_needs_discard(self) -> bool:
         gold_exists = self.game.board.gems[5] > 0
-        gem_capped = self.game.active_player.gems.sum() >= 10
+        gem_capped = self.game.active_player.gem_total >= 10
         return gold_exists and gem_capped
     
     @property
@@ -136,70 +141,60 @@ class SplendorGUI:
         player = self.game.active_player
         n_picked = len(self._take_picks)
         n_discarded = len(self._take_discards)
-        return max(0, player.gems.sum() + n_picked - n_discarded - 10)
-
-    @staticmethod
-    def compute_spend(card_cost, player) -> np.ndarray:
-        card_cost = np.maximum(card_cost - player.cards, 0)
-        spent_gems = np.minimum(player.gems, card_cost)
-        remainder = card_cost.sum() - spent_gems.sum()
-        spent_gems[5] = min(remainder, player.gems[5])
-        return spent_gems
-    
+        return max(0, player.gem_total + n_picked - n_discarded - 10)
+
     def _handle_board_click(self, mouse_x, mouse_y, button: int) -> None:
+        hit = self.clickmap.hit(mouse_x, mouse_y)
+        if hit is None:
+            return
+        token = hit[1]
+
         # Spend-selection mode; only accept player_gem clicks
         if self._spend_state or self._discard_state:
-            for rect, token in reversed(list(self.clickmap.items())):
-                if rect.contains(mouse_x, mouse_y):
-                    if token[0] == "player_gem":
-                        self._handle_spend_click(token[1], button)
-                    break
+            if token[0] == "player_gem":
+                self._handle_spend_click(token[1], button)
             return
 
         # Normal mode
-        for rect, token in reversed(list(self.clickmap.items())):
-            if rect.contains(mouse_x, mouse_y):
-                # Right click unfocuses any card
-                if button == 3:
-                    self._focus_target = None
-                    if not token[0].endswith("gem"):
-                        break
-                
-                # Clicking gems unfocuses cards and vice-versa
-                if button == 1 and token[0].endswith("gem"):
-                    self._focus_target = None
-                elif button == 1 and token[0].endswith("card"):
-                    self._take_picks.clear()
-                    self._take_discards.clear()
-
-                # Now apply click logic
-                kind = token[0]
-                if kind == "board_card":
-                    self._focus_target = FocusTarget.from_index(*token[1:])
-                elif kind == "reserved_card":
-                    self._focus_target = FocusTarget("reserved", reserve_idx=token[1])
-                elif kind == "board_gem":
-                    # Add/remove gem based on l/r click
-                    color = token[1]
-                    if button == 3 and color in self._take_picks:
-                        self._take_picks.remove(color)
-                    elif button == 1 and self._is_gem_click_allowed(color):
-                        self._take_picks.append(color)
-                elif kind == "player_gem":
-                    if self._spend_state is None and self.discards_required == 0 and button == 1:
-                        break
-
-                    # Add/remove gem based on l/r click
-                    color = token[1]
-                    if button == 3 and color in self._take_discards:
-                        self._take_discards.remove(color)
-                    elif button == 1:
-                        if color in self._take_discards:
-                            self._take_discards.remove(color)
-                        else:
-                            self._take_discards.append(color)
+        # Right click unfocuses any card
+        if button == 3:
+            self._focus_target = None
+            if not token[0].endswith("gem"):
+                return
+        
+        # Clicking gems unfocuses cards and vice-versa
+        if button == 1 and token[0].endswith("gem"):
+            self._focus_target = None
+        elif button == 1 and token[0].endswith("card"):
+            self._take_picks.clear()
+            self._take_discards.clear()
+
+        # Now apply click logic
+        kind = token[0]
+        if kind == "board_card":
+            self._focus_target = FocusTarget.from_index(*token[1:])
+        elif kind == "reserved_card":
+            self._focus_target = FocusTarget("reserved", reserve_idx=token[1])
+        elif kind == "board_gem":
+            # Add/remove gem based on l/r click
+            color = token[1]
+            if button == 3 and color in self._take_picks:
+                self._take_picks.remove(color)
+            elif button == 1 and self._is_gem_click_allowed(color):
+                self._take_picks.append(color)
+        elif kind == "player_gem":
+            if self._spend_state is None and self.discards_required == 0 and button == 1:
+                return
 
-                break
+            # Add/remove gem based on l/r click
+            color = token[1]
+            if button == 3 and color in self._take_discards:
+                self._take_discards.remove(color)
+            elif button == 1:
+                if color in self._take_discards:
+                    self._take_discards.remove(color)
+                else:
+                    self._take_discards.append(color)
     
     def _handle_context_menu_click(self, payload: tuple[str, GUIMove]) -> None:
         button_choice, move = payload
@@ -232,7 +227,7 @@ class SplendorGUI:
             else:
                 self._play_audio("cards")
                 if (move.kind == "reserve"
-                    and self.game.active_player.gems.sum() < 10
+                    and self.game.active_player.gem_total < 10
                     and self.game.board.gems[5] > 0):
                     self._play_audio("coins")
             
@@ -262,6 +257,11 @@ class SplendorGUI:
                 self._handle_mouse_event(event)
         elif event.type == pygame.USEREVENT and self._awaiting_ai:
             self._awaiting_ai = False
+        elif event.type == pygame.VIDEORESIZE:
+            self.window = pygame.display.get_surface()
+            self.overlay.update_window(self.window)
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self._dirty = True
         elif event.type == pygame.QUIT:
             self.running = False
         elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
@@ -275,20 +275,27 @@ class SplendorGUI:
 
         p = self.game.active_player
         opts: list[tuple[str, GUIMove]] = []
+
+        # One affordability pass covers every shop and reserved card
+        costs, _ = p.candidate_costs(self.game.board.cards)
+        aff = p.affordability(costs)
+
+        def add_buy_options(card, row: int) -> None:
+            if aff.afford_wo_gold[row] or aff.afford_with_gold[row]:
+                if aff.afford_with_gold[row] and aff.gold_choice[row]:
+                    # Allow for manually spending gems
+                    move = GUIMove("buy_choose", card=card, source=focus)
+                    opts.append(("Buy (mnl)", move))
+
+                # Always offer an auto-spend option
+                spend = aff.spend[row].copy()
+                move = GUIMove("buy", card=card, source=focus, spend=spend)
+                opts.append(("Buy (auto)", move))
+
         match focus.kind:
             case "shop":
                 card = self.game.board.cards[focus.tier][focus.pos]
-                afford_wo_gold, afford_with_gold = p.can_afford_card(card)
-                if afford_wo_gold or afford_with_gold:
-                    if afford_with_gold and p.gold_choice_exists(card):
-                        # Allow for manually spending gems
-                        move = GUIMove("buy_choose", card=card, source=focus)
-                        opts.append(("Buy (mnl)", move))
-                    
-                    # Always offer an auto-spend option
-                    spend = self.compute_spend(card.cost, p)
-                    move = GUIMove("buy", card=card, source=focus, spend=spend)
-                    opts.append(("Buy (auto)", move))
+                add_buy_options(card, 4*focus.tier + focus.pos)
 
                 if self._is_reserve_legal():
                     if self._reserve_needs_discard():
@@ -315,20 +322,20 @@ class SplendorGUI:
 
             case "reserved":
                 card = p.reserved_cards[focus.reserve_idx]
-                afford_wo_gold, afford_with_gold = p.can_afford_card(card)
-                if afford_wo_gold or afford_with_gold:
-                    if afford_with_gold and p.gold_choice_exists(card):
-                        # Allow for manually spending gems
-                        move = GUIMove("buy_choose", card=card, source=focus)
-                        opts.append(("Buy (mnl)", move))
-                    
-                    # Always offer an auto-spend option
-                    spend = self.compute_spend(card.cost, p)
-                    move = GUIMove("buy", card=card, source=focus, spend=spend)
-                    opts.append(("Buy (auto)", move))
+                add_buy_options(card, 12 + focus.reserve_idx)
 
         return opts
 
+    def _cached_menu_options(self, focus: FocusTarget) -> list[tuple[str, GUIMove]]:
+        """_card_menu_options, recomputed only when the scene or the
+        focused card changes.
+        """
+        state = (self._scene_stamp, focus)
+        if self._preview_state != state:
+            self._preview_lines = self._card_menu_options(focus)
+            self._preview_state = state
+        return self._preview_lines
+
     def _start_spend_mode(self, focus, card) -> None:
         """Engaged for self._spend_state or self._discard_state."""
         p = self.game.active_player
@@ -398,27 +405,40 @@ class SplendorGUI:
         # 1) Fresh clickmap and cached base frame
         scene_stamp = self.game.half_turns
         if self._scene_stamp != scene_stamp or self._base_frame is None:
-            self.clickmap, pil_img = self._renderer.render(self.game)
-            pil_img = pil_img.convert("RGB")
-            self._base_frame = pygame.image.frombuffer(
-                pil_img.tobytes(), pil_img.size, "RGB"
-            )
+            self.clickmap, self._base_frame = self._renderer.render(self.game)
             self._scene_stamp = scene_stamp
 
         # 2) Poll events using the clickmap
         for event in pygame.event.get():
             self._handle_event(event)
 
-        # 3) Blit cached base frame
-        self.window.blit(self._base_frame, (0, 0))
+        # Nothing changed since the last frame: only ponder and load
+        # upcoming cards (here when prefetching has no thread)
+        frame_key = self._frame_key()
+        if frame_key == self._last_frame_key and not self._dirty:
+            images = self._renderer.images
+            prefetched = not images.threaded and images.drain(1) > 0
+            self.idle = not self._ponder() and not prefetched
+            return
+        self._last_frame_key = frame_key
+        self._dirty = False
+        self.idle = False
+
+        # 3) Blit cached base frame, scaled once per scene and window size
+        frame_key = (scene_stamp, self.window.get_size())
+        if self._window_frame_key != frame_key:
+            size = frame_key[1]
+            if size == self._base_frame.get_size():
+                self._window_frame = self._base_frame
+            else:
+                self._window_frame = pygame.transform.smoothscale(self._base_frame, size)
+            self._window_frame_key = frame_key
+        self.window.blit(self._window_frame, (0, 0))
 
         # Victory banner
         if self.game.victor:
-            font = pygame.font.SysFont(None, 72)
             msg = "You win!" if any(p.victor and p.agent is self.human for p in self.game.players) else "You lose!"
-            txt  = font.render(msg, True, (255, 215, 0))
-            rect = txt.get_rect(center=self.window.get_rect().center)
-            self.window.blit(txt, rect)
+            self.overlay.draw_victory_banner(msg)
             pygame.display.flip()
             self.running = False
             return
@@ -469,32 +489,12 @@ class SplendorGUI:
             )
         elif self._focus_target:
             # Draw Submit/Clear button and context menu for clicked cards
-            options = self._card_menu_options(self._focus_target)
-            origin = None
-
-            match self._focus_target.kind:
-                case "shop":
-                    origin = next(
-                        (Coord(r.x0, r.y0) for r, p in self.clickmap.items()
-                         if p == ("board_card", self._focus_target.tier, self._focus_target.pos)),
-                        None,
-                    )
-                case "deck":
-                    origin = next(
-                        (Coord(r.x0, r.y0) for r, p in self.clickmap.items()
-                         if p == ("board_card", self._focus_target.tier, 4)),
-                        None,
-                    )
-                case "reserved":
-                    origin = next(
-                        (Coord(r.x0, r.y0) for r, p in self.clickmap.items()
-                         if p[0] == "reserved_card" and p[1] == self._focus_target.reserve_idx),
-                        None,
-                    )
-
-            if origin is not None and options:
+            options = self._cached_menu_options(self._focus_target)
+            rect = self.overlay.focus_rect(self.clickmap, self._focus_target)
+
+            if rect is not None and options:
                 self._ctx_rects = self.overlay.draw_card_context_menu(
-                    origin, options,
+                    Coord(rect.x0, rect.y0), options,
                 )
         elif self._take_picks:
             # Draw Submit/Clear button for clicked tokens
@@ -512,6 +512,61 @@ class SplendorGUI:
             self._ctx_rects.clear()
 
         pygame.display.flip()
+        self._ponder()
+
+    def _frame_key(self) -> tuple:
+        """Everything a frame depends on; frames are only redrawn
+        when it changes.
+        """
+        ss = self._spend_state
+        return (
+            self._scene_stamp,
+            self.window.get_size(),
+            self.lock.active,
+            bool(self.game.victor),
+            self._focus_target,
+            tuple(self._take_picks),
+            tuple(self._take_discards),
+            None if ss is None else tuple(ss["spend_picks"]),
+            self._discard_state,
+        )
+
+    def invalidate(self) -> None:
+        """Redraw on the next tick."""
+        self._dirty = True
+
+    def idle_timeout_ms(self) -> int:
+        """How long an idle loop may wait for input: until the UI
+        lock expires, and at most idle_poll_ms.
+        """
+        timeout = self.idle_poll_ms
+        if self.lock.locked_until is not None:
+            remaining = self.lock.locked_until - pygame.time.get_ticks()
+            if remaining > 0:
+                timeout = min(timeout, remaining)
+        return timeout
+
+    def wait_for_input(self) -> None:
+        """Block until an event arrives or idle_timeout_ms passes.
+        The event stays queued for the next tick.
+        """
+        event = pygame.event.wait(self.idle_timeout_ms())
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+
+    def _ponder(self) -> bool:
+        """Let AI agents search while the human thinks.  Returns
+        whether any search was left to do.  While the UI is locked the
+        game loop drives the AI through GUIGame.think instead, so a
+        frame never gets two slices.
+        """
+        if self.lock.active:
+            return False
+        nodes = 0
+        for player in self.game.players:
+            if player.agent is not self.human and hasattr(player.agent, "ponder"):
+                nodes += player.agent.ponder(self.game, self.ponder_ms)
+        return nodes > 0
 
     def run(self):
         """Wrapper that runs one non-blocking frame per iteration."""
@@ -526,7 +581,10 @@ class SplendorGUI:
         clock = pygame.time.Clock()
         while self.running:
             self.tick()
-            clock.tick(60)
+            if self.idle:
+                self.wait_for_input()
+            else:
+                clock.tick(60)
 
         pygame.quit()
         sys.exit()
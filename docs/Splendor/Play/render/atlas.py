@@ -0,0 +1,153 @@
+# Splendor/Play/render/atlas.py
+"""Pre-scaled sprite atlas.
+
+build_atlas() scales every sprite BoardRenderer draws to its
+BoardGeometry size once, at stage time, and packs them into a few page
+images plus a JSON index.  At runtime SpriteAtlas loads pages and
+hands out slices, so startup decodes a handful of files instead of one
+full-resolution image per card with a resize each.  Pages live in
+BoardRenderer's ImageCache with the loose images, under the same byte
+budget.  The web build stages it with docs/webstage.py; without one the
+renderer falls back to the full-size images.
+"""
+
+import json
+from pathlib import Path
+
+from Splendor.Play.render import BoardGeometry, Coord
+from Splendor.Play.render.cache import ImageCache
+
+
+INDEX = "atlas.json"
+PAGE_WIDTH = 2048
+ALIGN = 8  # JPEG block size, so sprites don't share blocks
+
+
+def sprite_specs(img_root: Path, geom: BoardGeometry):
+    """(relative path, size, alpha) of every sprite the board draws."""
+    yield "table.jpg", geom.canvas, False
+    for tier in range(3):
+        for path in sorted((img_root / str(tier)).glob("*.jpg")):
+            if path.stem.isdigit() or path.stem == "cover":  # Not the tier sheets
+                yield f"{tier}/{path.name}", geom.card, False
+    for path in sorted((img_root / "nobles").glob("*.jpg")):
+        yield f"nobles/{path.name}", geom.noble, False
+    for path in sorted((img_root / "gems").glob("*.png")):
+        yield f"gems/{path.name}", geom.gem, True
+
+
+def _align(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def _shelf_pack(sizes: dict[str, Coord], width: int) -> tuple[dict[str, tuple[int, int]], Coord]:
+    """Tallest first, left to right in rows.  Returns positions and
+    the page size.
+    """
+    positions = {}
+    x = y = row_h = page_w = 0
+    for name in sorted(sizes, key=lambda n: -sizes[n].y):
+        w, h = sizes[name]
+        if x and x + w > width:
+            x, y, row_h = 0, y + row_h, 0
+        positions[name] = (x, y)
+        page_w = max(page_w, x + w)
+        x += _align(w)
+        row_h = max(row_h, _align(h))
+    return positions, Coord(page_w, y + row_h)
+
+
+def build_atlas(img_root: Path, out_dir: Path, geom: BoardGeometry | None = None) -> Path:
+    """Write the pages and index to out_dir and return the index path.
+    Opaque sprites go on JPEG pages, alpha ones on a PNG page, and
+    anything wider than a page on its own.
+    """
+    from PIL import Image  # Stage time only, the runtime loads pages through its backend
+
+    geom = geom or BoardGeometry()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    groups: dict[str, dict[str, Coord]] = {}
+    alpha_of: dict[str, bool] = {}
+    for name, size, alpha in sprite_specs(img_root, geom):
+        if size.x > PAGE_WIDTH:
+            page = Path(name).stem + ".jpg"
+        else:
+            page = "sprites.png" if alpha else "sprites.jpg"
+        groups.setdefault(page, {})[name] = size
+        alpha_of[name] = alpha
+
+    index: dict = {"pages": {}, "sprites": {}}
+    for page, sizes in groups.items():
+        positions, page_size = _shelf_pack(sizes, PAGE_WIDTH)
+        alpha = page.endswith(".png")
+        canvas = Image.new("RGBA" if alpha else "RGB", page_size)
+        for name, (x, y) in positions.items():
+            img = Image.open(img_root / name).convert("RGBA" if alpha_of[name] else "RGB")
+            img = img.resize(sizes[name], Image.Resampling.BILINEAR)
+            canvas.paste(img, (x, y))
+            index["sprites"][name] = [page, x, y, *sizes[name]]
+
+        if alpha:
+            canvas.save(out_dir / page, optimize=True)
+        else:  # No chroma subsampling, blocks stay within sprites
+            canvas.save(out_dir / page, quality=92, subsampling=0)
+        index["pages"][page] = {"alpha": alpha, "size": list(page_size)}
+
+    index_path = out_dir / INDEX
+    index_path.write_text(json.dumps(index))
+    return index_path
+
+
+class SpriteAtlas:
+    def __init__(self, root: Path, backend, pages: ImageCache):
+        """Index at root/atlas.json; pages load on first use through
+        the BoardRenderer canvas backend and are kept in pages, so
+        they count against its byte budget and are evicted whole.
+        """
+        self.root = root
+        self.backend = backend
+        self.pages = pages
+        index = json.loads((root / INDEX).read_text())
+        self.page_info: dict = index["pages"]
+        self.sprites: dict[str, list] = index["sprites"]
+
+    @classmethod
+    def find(cls, root: Path, backend, pages: ImageCache) -> "SpriteAtlas | None":
+        """The atlas under root, or None if it hasn't been built."""
+        return cls(root, backend, pages) if (root / INDEX).exists() else None
+
+    @property
+    def nbytes(self) -> int:
+        """Decoded size of every page, at 4 bytes a pixel at most."""
+        return sum(4 * w * h for w, h in (info["size"] for info in self.page_info.values()))
+
+    def _entry(self, name: str, target: Coord, alpha: bool):
+        entry = self.sprites.get(name)
+        if entry is None:
+            return None
+        page, x, y, w, h = entry
+        if (w, h) != tuple(target) or self.page_info[page]["alpha"] != alpha:
+            return None
+        return entry
+
+    def page_item(self, name: str, target: Coord, alpha: bool):
+        """(key, load) of the page holding sprite name, for
+        ImageCache.preload and prefetch, or None if it isn't here.
+        """
+        entry = self._entry(name, target, alpha)
+        if entry is None:
+            return None
+        path = self.root / entry[0]
+        return path, lambda: self.backend.load_page(path, alpha)
+
+    def get(self, name: str, target: Coord, alpha: bool):
+        """Sprite name (path relative to the images folder) at target
+        size, or None if the atlas has no such sprite.  It shares the
+        page's pixels, so callers copy rather than keep it.
+        """
+        item = self.page_item(name, target, alpha)
+        if item is None:
+            return None
+        _, x, y, w, h = self.sprites[name]
+        return self.backend.slice(self.pages.get(*item), (x, y, x + w, y + h))
@@ -1,125 +1,300 @@
-# Splendor/Play/render/board_renderer.py 
+# Splendor/Play/render/board_renderer.py
+"""Renders the board as layers over a persistent canvas.
+
+The table and deck covers never change, so they form a static layer
+drawn once.  Everything else lives in fixed, non-overlapping regions
+(each noble, shop slot and board gem pile, each player's area and the
+HUD) that remember a signature of the game state they show.  A render
+only recomposites the regions whose signature changed, restoring the
+static layer underneath first, so a typical move redraws a handful of
+small rectangles instead of the whole canvas.
+
+Drawing goes through a canvas backend: "pil" renders PIL images for
+headless use and export, "pygame" renders pygame Surfaces that the GUI
+can blit as they are.
+"""
 
-from PIL import Image, ImageDraw, ImageFont
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from Splendor.Environment.gui_game import GUIGame
-    from Splendor.Play import ClickMap, ClickToken
-from Splendor.Play.render import BoardGeometry, Rect, Coord, FONT_PATH
+    from Splendor.Play import ClickToken
+from Splendor.Play import ClickMap
+from Splendor.Play.render import BoardGeometry, Rect, Coord
+from Splendor.Play.render.atlas import SpriteAtlas
+from Splendor.Play.render.cache import ImageCache, LRUCache
+from Splendor.Play.render.canvas import CANVASES
 from Splendor.Play.render.static_renderer import move_to_text
 
 
+STACK_CACHE_SIZE = 64  # Owned-card stacks, prefixes included
+
+
 class BoardRenderer:
-    def __init__(self):
+    def __init__(self, backend: str = "pil", image_budget_mb: float = 64, prefetch_depth: int = 2):
+        """image_budget_mb bounds the loaded sprites and atlas pages;
+        the next prefetch_depth cards of each deck are loaded ahead of
+        time.
+        """
         # Assets
         base = Path(__file__).resolve().parent
         self.resource_root = base / "Resources"
         self.img_root = self.resource_root / "images"
-        self._img_cache: dict[Path, Image.Image] = {}
-        self.font = ImageFont.truetype(FONT_PATH, 60)
-
-        # Runtime state
-        self._canvas: Image.Image
+        self.backend = CANVASES[backend]()
+        budget = image_budget_mb * 2**20
+        self.images = ImageCache(budget, self.backend.nbytes)
+        self.atlas = SpriteAtlas.find(self.resource_root / "atlas", self.backend, self.images)
+        if self.atlas is not None and self.atlas.nbytes > budget:
+            self.atlas = None  # Pages would evict each other every frame, load loose files
+        self.prefetch_depth = prefetch_depth
+
+        # Player area sprites: gem piles by (color, count) and owned
+        # card stacks by (color, cards), the latter grown card by card
+        self._gem_piles: dict[tuple[int, int], Any] = {}
+        self._card_stacks = LRUCache(STACK_CACHE_SIZE)
+
+        # Runtime state, images are the backend's type
+        self._canvas: Any = None
+        self._static: Any = None  # table + deck covers
+        self._static_marks: dict[Rect, "ClickToken"] = {}
         self.geom = BoardGeometry()
-        self.draw: ImageDraw.ImageDraw
-        self._clickmap: "ClickMap" = {}
+        self._clickmap = ClickMap()
         self.game: "GUIGame"
 
+        # Layers: per region key the signature drawn, its click marks and,
+        # for regions with overlays, the drawing underneath.  Plus the
+        # region currently being drawn into
+        self._signatures: dict[tuple, tuple] = {}
+        self._region_marks: dict[tuple, dict[Rect, "ClickToken"]] = {}
+        self._bodies: dict[tuple, tuple[object, Any]] = {}  # Under overlays
+        self._layer: Any = None
+        self._layer_origin = Coord(0, 0)
+        self._marks: dict[Rect, "ClickToken"] = {}
+
     # Public API
     def render(self, game: "GUIGame"):
+        """Returns (clickmap, canvas).  The canvas is updated in
+        place between calls, so copy it to keep a frame.  It's a PIL
+        image or a pygame Surface depending on the backend.
+        """
         self.game = game
-        self._reset_canvas()
+        if self._canvas is None:
+            self._reset_canvas()
+
+        for key, rect, signature, draw, overlay in self._regions(game):
+            overlay_sig, draw_overlay = overlay or (None, None)
+            if self._signatures.get(key) == (signature, overlay_sig):
+                continue
+
+            body = self._bodies.get(key)
+            if body is None or body[0] != signature:
+                body = (signature, self._redraw(key, rect, draw))
+                if overlay:
+                    self._bodies[key] = body
+            self.backend.paste(self._canvas, body[1], (rect.x0, rect.y0))
+            if overlay_sig is not None:  # Straight onto the canvas, the body stays clean
+                self._layer = self._canvas
+                self._layer_origin = Coord(0, 0)
+                draw_overlay()
+            self._signatures[key] = (signature, overlay_sig)
+
+        # Players' own gems and reserves are only clickable on their turn
+        active = ("player", game.active_player.pos)
+        marks = dict(self._static_marks)
+        for key, region_marks in self._region_marks.items():
+            if key[0] != "player" or key == active:
+                marks.update(region_marks)
+        self._clickmap = ClickMap(marks.items())
+        self._prefetch(game.board)
+        return self._clickmap, self._canvas
 
-        # Draw board
-        self._draw_background()
-        self._draw_nobles(game.board.nobles)
-        self._draw_board_cards(game.board)
-        self._draw_board_gems(game.board)
+    def invalidate(self) -> None:
+        """Force a full redraw on the next render."""
+        self._canvas = None
+
+    # Layers
+    def _regions(self, game: "GUIGame"):
+        """(key, rect, signature, draw, overlay) for every dynamic
+        region, in z-order.  Rects don't overlap, so regions redraw
+        independently.  overlay is None or (signature, draw) for text
+        drawn over a cached copy of the region, so it can come and go
+        without redrawing what is underneath.  Overlays draw on the
+        canvas directly and must stay inside their region.
+        """
+        g = self.geom
+        board = game.board
 
-        # Draw Players
-        for player in game.players:
-            self._draw_player(player)
+        # HUD
+        yield ("hud",), Rect(0, 0, g.player_origins[0].x, g.nobles_origin.y), \
+            game.half_turns // 2, lambda: self._draw_turn_indicator(game.half_turns), None
 
-        # Draw HUD
-        self._draw_turn_indicator(game.half_turns)
+        # Nobles
+        x, y = g.nobles_origin
+        for slot, noble in enumerate(board.nobles):
+            yield ("noble", slot), Rect.from_size(x, y, *g.noble), \
+                noble.id if noble else None, lambda x=x, noble=noble: self._draw_noble(noble, x, y), None
+            x += g.card.x + g.noble_offset.w
 
-        return self._clickmap, self._canvas
+        # Shop cards, top tier first
+        y = g.shop_origin.y
+        for tier in (2, 1, 0):
+            x = g.shop_origin.x
+            for pos, card in enumerate(board.cards[tier]):
+                yield ("shop", tier, pos), Rect.from_size(x, y, *g.card), \
+                    card.id if card else None, \
+                    lambda x=x, y=y, tier=tier, pos=pos, card=card: self._draw_board_card(tier, pos, card, x, y), \
+                    None
+                x += g.card.x + g.board_card_offset.w
+            y += g.card.y + g.board_card_offset.h
+
+        # Board gems: sprite plus count, up to the player areas
+        gem_x, gem_y = g.gem_origin
+        step = g.gem.y + g.board_gem_offset.h
+        for color, count in enumerate(board.gems):
+            rect = Rect(gem_x - 20, gem_y - 15, g.player_origins[0].x, gem_y - 15 + step)
+            yield ("board_gem", color), rect, int(count), \
+                lambda color=color, count=count, gem_y=gem_y: self._draw_board_gem(color, count, gem_x, gem_y), \
+                None
+            gem_y += step
+
+        # Players: everything right of the board, split between seats,
+        # with the last move written over the waiting player
+        split = g.player_origins[1].y
+        for player in game.players:
+            top = 0 if player.pos == 0 else split
+            bottom = split if player.pos == 0 else g.canvas.y
+            signature = (
+                player.gems.tobytes(),
+                tuple(map(tuple, player.card_ids)),
+                tuple(card.id for card in player.reserved_cards),
+                tuple(player.noble_ids),
+            )
+            waiting = player is not game.active_player and isinstance(game.move_idx, int)
+            overlay = (game.move_idx if waiting else None), lambda player=player: self._draw_last_move(player)
+            yield ("player", player.pos), Rect(g.player_origins[0].x, top, g.canvas.x, bottom), \
+                signature, lambda player=player: self._draw_player(player), overlay
+
+    def _redraw(self, key: tuple, rect: Rect, draw):
+        """Draw one region over the static layer and return it."""
+        assert self._static is not None
+        self._layer = self.backend.crop(self._static, rect)
+        self._layer_origin = Coord(rect.x0, rect.y0)
+        self._marks = self._region_marks[key] = {}
+        draw()
+        return self._layer
+
+    def _paste(self, image, xy: tuple[int, int]) -> None:
+        """Paste in canvas coordinates into the current region."""
+        x0, y0 = self._layer_origin
+        self.backend.paste(self._layer, image, (xy[0] - x0, xy[1] - y0))
+
+    def _text(self, xy: tuple[int, int], text: str) -> None:
+        x0, y0 = self._layer_origin
+        self.backend.text(self._layer, (xy[0] - x0, xy[1] - y0), text)
 
     # Internals
-    def _load(self, path: Path, target: Coord, alpha: bool = False) -> Image.Image:
-        if path not in self._img_cache:
-            img = Image.open(path)
-            img = img.convert("RGBA" if alpha else "RGB")
-            img = img.resize((target.x, target.y), Image.Resampling.BILINEAR)
-            self._img_cache[path] = img
-        else:
-            cached = self._img_cache[path]
-            assert cached.size == (target.x, target.y) and cached.mode == ("RGBA" if alpha else "RGB"), (
-                f"Cached image spec mismatch for {path} — "
-                f"got size={cached.size}, mode={cached.mode}; "
-                f"expected size={(target.x, target.y)}, mode={'RGBA' if alpha else 'RGB'}"
-            )
-        return self._img_cache[path]
+    def _load(self, path: Path, target: Coord, alpha: bool = False):
+        """Sprite from the atlas if it was built, else scaled from
+        the full-size image.  Atlas sprites are slices of a cached
+        page and aren't cached again themselves.
+        """
+        if self.atlas is not None:
+            sprite = self.atlas.get(self._atlas_name(path), target, alpha)
+            if sprite is not None:
+                return sprite
+        return self.images.get(path, lambda: self.backend.load(path, target, alpha))
+
+    def _atlas_name(self, path: Path) -> str:
+        return path.relative_to(self.img_root).as_posix()
+
+    def _cache_item(self, path: Path, target: Coord, alpha: bool = False):
+        """(key, load) that caches what _load needs for path: its
+        atlas page, or the scaled image.
+        """
+        if self.atlas is not None:
+            item = self.atlas.page_item(self._atlas_name(path), target, alpha)
+            if item is not None:
+                return item
+        return path, lambda: self.backend.load(path, target, alpha)
+
+    def preload(self) -> None:
+        """Load the sprites every game shows: table, deck covers,
+        gems and nobles.
+        """
+        g = self.geom
+        items = [(self.img_root / "table.jpg", g.canvas, False)]
+        items += [(self.img_root / str(tier) / "cover.jpg", g.card, False) for tier in range(3)]
+        items += [(self.img_root / "gems" / f"{color}.png", g.gem, True) for color in range(6)]
+        items += [
+            (path, g.noble, False)
+            for path in sorted((self.img_root / "nobles").glob("*.jpg")) if path.stem.isdigit()
+        ]
+        self.images.preload(self._cache_item(*item) for item in items)
+
+    def _prefetch(self, board) -> None:
+        """Queue the cards each deck deals next (Deck.draw pops from
+        the end of Deck.cards).
+        """
+        items = []
+        for deck in board.decks:
+            for card in deck.cards[::-1][:self.prefetch_depth]:
+                path = self.img_root / str(card.tier) / f"{card.id}.jpg"
+                items.append(self._cache_item(path, self.geom.card))
+        self.images.prefetch(items)
 
     def _reset_canvas(self):
-        self._canvas = Image.new("RGB", self.geom.canvas)
-        self.draw = ImageDraw.Draw(self._canvas)
-        self._clickmap = {}
+        """Build the static layer and start from it."""
+        self.preload()
+        self._static = self.backend.new(self.geom.canvas)
+        self._layer = self._static
+        self._layer_origin = Coord(0, 0)
+        self._marks = self._static_marks = {}
+        self._draw_background()
+        self._draw_deck_covers()
+
+        self._canvas = self.backend.copy(self._static)
+        self._signatures.clear()
+        self._region_marks.clear()
+        self._bodies.clear()
 
     def _mark(self, rect: Rect, payload: "ClickToken"):
         """Register a board region as clickable payload."""
-        self._clickmap[rect] = payload
+        self._marks[rect] = payload
 
     def _draw_background(self):
         canvas_path = self.img_root / "table.jpg"
         canvas_image = self._load(canvas_path, self.geom.canvas)
-        self._canvas.paste(canvas_image, (0, 0))
-
-    def _draw_nobles(self, nobles):
-        g = self.geom
-        x, y = g.nobles_origin
-        for noble in nobles:
-            if noble:
-                noble_path = self.img_root / "nobles" / f"{noble.id}.jpg"
-                noble_image = self._load(noble_path, g.noble)
-                self._canvas.paste(noble_image, (x, y))
-            x += g.card.x + g.noble_offset.w
+        self._paste(canvas_image, (0, 0))
 
-    def _draw_board_cards(self, board):
-        # Tier covers + face‑up cards
+    def _draw_deck_covers(self):
         g = self.geom
-        x, y = g.shop_origin
-        deck_x = g.deck_origin.x
-        card_width, card_height = g.card
-
-        for reversed_tier, tier_cards in enumerate(reversed(board.cards)):
-            tier = 2 - reversed_tier
-
-            # Deck cover
+        y = g.shop_origin.y
+        for tier in (2, 1, 0):
             cover_path = self.img_root / str(tier) / "cover.jpg"
             cover_image = self._load(cover_path, g.card)
-            self._canvas.paste(cover_image, (deck_x, y))
+            self._paste(cover_image, (g.deck_origin.x, y))
             self._mark(
-                Rect.from_size(deck_x, y, *g.card), 
+                Rect.from_size(g.deck_origin.x, y, *g.card),
                 ("board_card", tier, 4),
             )
-
-            # Face‑up cards
-            for position, card in enumerate(tier_cards):
-                if card:
-                    card_path = self.img_root / str(tier) /f"{card.id}.jpg"
-                    card_image = self._load(card_path, g.card)
-                    self._canvas.paste(card_image, (x, y))
-                    self._mark(
-                        Rect.from_size(x, y, *g.card), 
-                        ("board_card", tier, position),
-                    )
-                x += card_width + g.board_card_offset.w
-
-            x = g.shop_origin.x
-            y += card_height + g.board_card_offset.h
+            y += g.card.y + g.board_card_offset.h
+
+    def _draw_noble(self, noble, x: int, y: int):
+        if noble:
+            noble_path = self.img_root / "nobles" / f"{noble.id}.jpg"
+            noble_image = self._load(noble_path, self.geom.noble)
+            self._paste(noble_image, (x, y))
+
+    def _draw_board_card(self, tier: int, position: int, card, x: int, y: int):
+        if card:
+            card_path = self.img_root / str(tier) / f"{card.id}.jpg"
+            card_image = self._load(card_path, self.geom.card)
+            self._paste(card_image, (x, y))
+            self._mark(
+                Rect.from_size(x, y, *self.geom.card),
+                ("board_card", tier, position),
+            )
 
     def _draw_reserved_cards(self, player):
         # Reserved cards
@@ -129,80 +304,91 @@ class BoardRenderer:
         for reserve_idx, card in enumerate(player.reserved_cards):
             card_path = self.img_root / str(card.tier) / f"{card.id}.jpg"
             card_image = self._load(card_path, g.card)
-            self._canvas.paste(card_image, (x, y))
+            self._paste(card_image, (x, y))
 
-            # Click target only for active player
-            if player is self.game.active_player:
-                move_idx = player.take_dim + 24 + reserve_idx * 2
-                self._mark(
-                    Rect.from_size(x, y, *g.card), 
-                    ("reserved_card", reserve_idx, move_idx),
-                )
+            # Click target, kept only for the active player
+            move_idx = player.take_dim + 24 + reserve_idx * 2
+            self._mark(
+                Rect.from_size(x, y, *g.card),
+                ("reserved_card", reserve_idx, move_idx),
+            )
 
             # Fan offset
             x += g.reserve_offset.w
             y += g.reserve_offset.h
 
-    def _draw_board_gems(self, board):
+    def _draw_board_gem(self, gem_index: int, gem_count: int, gem_x: int, gem_y: int):
         g = self.geom
-        gem_x, gem_y = g.gem_origin
+        gem_path = self.img_root / "gems" / f"{gem_index}.png"
+        gem_image = self._load(gem_path, g.gem, alpha=True)
 
-        for gem_index, gem_count in enumerate(board.gems):
-            gem_path = self.img_root / "gems" / f"{gem_index}.png"
-            gem_image = self._load(gem_path, g.gem, alpha=True)
-
-            # Gem sprite and count
-            self._canvas.paste(gem_image, (gem_x-20, gem_y-15), gem_image)
-            self.draw.text(
-                (gem_x + g.gem.x + g.board_gem_text_offset.w, gem_y),
-                str(gem_count),
-                fill=(255, 255, 255),
-                font=self.font,
-            )
+        # Gem sprite and count
+        self._paste(gem_image, (gem_x-20, gem_y-15))
+        self._text((gem_x + g.gem.x + g.board_gem_text_offset.w, gem_y), str(gem_count))
 
-            # Clickable if not a gold gem
-            if gem_index != 5:
-                self._mark(
-                    Rect.from_size(gem_x-20, gem_y-15, *g.gem), 
-                    ("board_gem", gem_index),
-                )
+        # Clickable if not a gold gem
+        if gem_index != 5:
+            self._mark(
+                Rect.from_size(gem_x-20, gem_y-15, *g.gem),
+                ("board_gem", gem_index),
+            )
 
-            gem_y += g.gem.y + g.board_gem_offset.h
+    def _gem_pile(self, color: int, count: int):
+        """Alpha sprite of count gems stacked downwards."""
+        key = (color, count)
+        if key not in self._gem_piles:
+            g = self.geom
+            gem_image = self._load(self.img_root / "gems" / f"{color}.png", g.gem, alpha=True)
+            step = g.player_gem_offset.h
+            pile = self.backend.new(Coord(g.gem.x, g.gem.y + step * (count - 1)), alpha=True)
+            for i in range(count):
+                self.backend.composite(pile, gem_image, (0, i * step))
+            self._gem_piles[key] = pile
+        return self._gem_piles[key]
+
+    def _card_stack(self, color: int, cards: tuple[tuple[int, int], ...]):
+        """Opaque sprite of owned (tier, id) cards fanned downwards,
+        later cards on top.  Built from the stack without the last
+        card, so buying a card costs two pastes.
+        """
+        key = (color, cards)
+        stack = self._card_stacks.get(key)
+        if stack is None:
+            g = self.geom
+            step = g.player_card_offset.h
+            stack = self.backend.new(Coord(g.card.x, g.card.y + step * (len(cards) - 1)))
+            if len(cards) > 1:
+                self.backend.paste(stack, self._card_stack(color, cards[:-1]), (0, 0))
+            tier, card_id = cards[-1]
+            card_image = self._load(self.img_root / str(tier) / f"{card_id}.jpg", g.card)
+            self.backend.paste(stack, card_image, (0, step * (len(cards) - 1)))
+            self._card_stacks[key] = stack
+        return stack
 
     def _draw_player(self, player):
         """Draws images and marks clickable areas for player stuffs."""
         # Gems and owned cards
         g = self.geom
         start_x, start_y = g.player_origin(player.pos)
-        current_x, current_y = start_x, start_y
+        current_x = start_x
 
         for gem_index, gem_count in enumerate(player.gems):
-            gem_path = self.img_root / "gems" / f"{gem_index}.png"
-            gem_image = self._load(gem_path, g.gem, alpha=True)
-
             # Gem pile
-            for _ in range(gem_count):
-                self._canvas.paste(gem_image, (current_x, current_y), gem_image)
-                current_y += g.player_gem_offset.h
-            
-            if player is self.game.active_player:
-                pile_h = g.gem.y + g.player_gem_offset.h * max(gem_count - 1, 0)
-                self._mark(  # Only one clickable big rect for the gems
-                    Rect.from_size(current_x, start_y, g.gem.x, pile_h), 
-                    ("player_gem", gem_index),
-                )
+            if gem_count:
+                self._paste(self._gem_pile(gem_index, int(gem_count)), (current_x, start_y))
+
+            pile_h = g.gem.y + g.player_gem_offset.h * max(gem_count - 1, 0)
+            self._mark(  # Only one clickable big rect for the gems
+                Rect.from_size(current_x, start_y, g.gem.x, pile_h),
+                ("player_gem", gem_index),
+            )
 
             # Permanent bought cards
-            if gem_index != 5:
-                current_y = start_y + g.card.y
-                for tier, card_id in player.card_ids[gem_index]:
-                    card_path = self.img_root / str(tier) / f"{card_id}.jpg"
-                    card_image = self._load(card_path, g.card)
-                    self._canvas.paste(card_image, (current_x, current_y))
-                    current_y += g.player_card_offset.h
+            if gem_index != 5 and player.card_ids[gem_index]:
+                stack = self._card_stack(gem_index, tuple(player.card_ids[gem_index]))
+                self._paste(stack, (current_x, start_y + g.card.y))
 
             current_x += g.card.x + g.player_card_offset.w
-            current_y = start_y
 
         # Reserved cards
         self._draw_reserved_cards(player)
@@ -212,31 +398,24 @@ class BoardRenderer:
         for noble_id in player.noble_ids:
             noble_path = self.img_root / "nobles" / f"{noble_id}.jpg"
             noble_image = self._load(noble_path, g.noble)
-            self._canvas.paste(noble_image, (x, y))
+            self._paste(noble_image, (x, y))
             x += g.noble.x + g.player_noble_offset.w
 
-        # Draw the other player's previous move for context
-        if player is not self.game.active_player:
-            self._draw_last_move(player)
-
     def _draw_last_move(self, player):
         """Annotate the board with the bot's last move."""
-        if not isinstance(self.game.move_idx, int):
-            return
-        
+        assert isinstance(self.game.move_idx, int)
         move_text = move_to_text(self.game.move_idx, player)
-        x, y = self.geom.move_text_origin(player.pos)
-        self.draw.text((x, y), move_text, fill=(255, 255, 255), font=self.font)
+        self._text(self.geom.move_text_origin(player.pos), move_text)
 
     def _draw_turn_indicator(self, half_turns: int):
         turn_num = half_turns // 2 + 1
-        self.draw.text((50, 50), f"Turn {turn_num}",
-                       fill=(255, 255, 255), font=self.font)
+        self._text((50, 50), f"Turn {turn_num}")
 
     def _save(self, buf):
-        self._canvas.save(buf, format="PNG")
+        assert self._canvas is not None
+        self.backend.save(self._canvas, buf)
         buf.seek(0)
 
     @property
-    def clickmap(self) -> "ClickMap":
-        return self._clickmap.copy()
+    def clickmap(self) -> ClickMap:
+        return self._clickmap
@@ -11,28 +11,54 @@ if TYPE_CHECKING:
     from Splendor.Play.common_types import GUIMove
 from Splendor.Play import FocusTarget, ClickMap
 from Splendor.Play.render import BoardGeometry, Coord, Rect, FONT_PATH
+from Splendor.Play.render.cache import LRUCache
+
+
+TEXT_CACHE_SIZE = 128
+BUTTON_CACHE_SIZE = 32
 
 
 class OverlayRenderer:
     def __init__(self, window):
         self.geom = BoardGeometry()
         self.window = window
+        self._scale = self._compute_scale()
         self.font = pygame.font.Font(str(FONT_PATH), 44)
         self.small_font = pygame.font.Font(str(FONT_PATH), 36)
         self.card_font = pygame.font.Font(str(FONT_PATH), 32)
+        self.banner_font: pygame.font.Font | None = None  # Loaded on first use
 
-    def scale(self) -> tuple[float, float]:
-        """Scale coordinates because the window can resize."""
+        # Pre-rendered text and buttons, the buttons at window scale
+        self._texts = LRUCache(TEXT_CACHE_SIZE)
+        self._buttons = LRUCache(BUTTON_CACHE_SIZE)
+
+    def _compute_scale(self) -> tuple[float, float]:
         board_w, board_h = self.geom.canvas
         window_w, window_h = self.window.get_size()
         return window_w / board_w, window_h / board_h
+
+    def scale(self) -> tuple[float, float]:
+        """Board to window scale, because the window can resize.
+        Only recomputed by update_window().
+        """
+        return self._scale
     
     def to_window(self, rect: Rect) -> Rect:
-        scaled_x, scaled_y = self.scale()
+        scaled_x, scaled_y = self._scale
         return rect.scaled(scaled_x, scaled_y)
 
     def update_window(self, window: pygame.Surface) -> None:
+        """Call on VIDEORESIZE."""
         self.window = window
+        self._scale = self._compute_scale()
+        self._buttons.clear()
+
+    def _text_surface(self, font: pygame.font.Font, text: str, color: tuple) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = self._texts[key] = font.render(text, True, color)
+        return surface
 
     def draw_selection_highlights(
             self, 
@@ -52,7 +78,7 @@ class OverlayRenderer:
         def draw_count_tag(rect, n: int):
             if n <= 1: return
             r_win = rect.scaled(sx, sy).to_pygame()
-            tag = self.small_font.render(f"x{n}", True, (255, 255, 0))
+            tag = self._text_surface(self.small_font, f"x{n}", (255, 255, 0))
             self.window.blit(
                 tag,
                 (r_win.right - tag.get_width() - 4,
@@ -60,64 +86,68 @@ class OverlayRenderer:
             )
 
         if focus_target:  # Selected a card
-            match focus_target.kind:
-                case "shop":
-                    key = ("board_card", focus_target.tier, focus_target.pos)
-                    for r, payload in clickmap.items():
-                        if payload == key:
-                            outline(r, (255, 255, 0))
-                            break
-                case "deck":
-                    key = ("board_card", focus_target.tier, 4)
-                    for r, payload in clickmap.items():
-                        if payload == key:
-                            outline(r, (255, 255, 0))
-                            break
-                case "reserved":
-                    for r, payload in clickmap.items():
-                        if payload[0] == "reserved_card" and payload[1] == focus_target.reserve_idx:
-                            outline(r, (255, 255, 0))
-                            break
+            r = self.focus_rect(clickmap, focus_target)
+            if r is not None:
+                outline(r, (255, 255, 0))
             
             # Manual spend mode
             if sum(spent_gems) > 0:
-                for r, payload in clickmap.items():
-                    gem_type, gem_idx = payload[0], payload[1]
-                    if gem_type == "player_gem" and spent_gems[gem_idx] > 0:
+                for gem_idx, n in enumerate(spent_gems):
+                    r = clickmap.rect_of("player_gem", gem_idx)
+                    if n > 0 and r is not None:
                         outline(r, (0, 128, 255))
-                        draw_count_tag(r, spent_gems[gem_idx])
+                        draw_count_tag(r, n)
         else:  # Taking gems
-            pick_cnts = Counter(picked_gems)
-            disc_cnts = Counter(discard_gems)
-            for r, payload in clickmap.items():
-                gem_type, gem_idx = payload[0], payload[1]
-                if gem_type == "board_gem" and gem_idx in pick_cnts:
+            for gem_idx, n in Counter(picked_gems).items():
+                r = clickmap.rect_of("board_gem", gem_idx)
+                if r is not None:
                     outline(r, (0, 255, 0))
-                    draw_count_tag(r, pick_cnts[gem_idx])
-                elif gem_type == "player_gem":
-                    if gem_idx in disc_cnts:
-                        outline(r, (255, 0, 0))
+                    draw_count_tag(r, n)
+            for gem_idx in set(discard_gems):
+                r = clickmap.rect_of("player_gem", gem_idx)
+                if r is not None:
+                    outline(r, (255, 0, 0))
+
+    @staticmethod
+    def focus_rect(clickmap: ClickMap, focus_target: FocusTarget) -> Rect | None:
+        """Board rect of the focused card."""
+        match focus_target.kind:
+            case "shop":
+                return clickmap.rect_of("board_card", focus_target.tier, focus_target.pos)
+            case "deck":
+                return clickmap.rect_of("board_card", focus_target.tier, 4)
+            case "reserved":
+                return clickmap.rect_of("reserved_card", focus_target.reserve_idx)
+        return None
+
+    def _button_surface(self, size: tuple[int, int], alpha: int, label, font) -> pygame.Surface:
+        """Background, border and label of a button in one surface,
+        rendered once per look.
+        """
+        key = (size, alpha, label, font)
+        surface = self._buttons.get(key)
+        if surface is None:
+            w, h = size
+
+            # Background
+            surface = pygame.Surface((w, h), pygame.SRCALPHA)
+            surface.fill((30, 30, 30, alpha))
+
+            # Border
+            pygame.draw.rect(surface, (255, 255, 255), (0, 0, w, h), 2)
+
+            # Label
+            txt = self._text_surface(font, label, (255, 255, 255))
+            tx = (w - txt.get_width()) // 2  # center horizontally
+            ty = (h - txt.get_height()) // 2  # center vertically
+            surface.blit(txt, (tx, ty))
+            self._buttons[key] = surface
+        return surface
 
     def _draw_button(self, rect: Rect, alpha: int, label, font) -> None:
         """Draws the move Submit/Clear button."""
-        # Scale
         r_win = self.to_window(rect).to_pygame()
-        x0, y0 = r_win.topleft
-        w, h = r_win.size
-
-        # Background
-        surface = pygame.Surface((w, h), pygame.SRCALPHA)
-        surface.fill((30, 30, 30, alpha))
-        self.window.blit(surface, (x0, y0))
-
-        # Border
-        pygame.draw.rect(self.window, (255, 255, 255), (x0, y0, w, h), 2)
-
-        # Label
-        txt = font.render(label, True, (255, 255, 255))
-        tx = x0 + (w - txt.get_width()) // 2  # center horizontally
-        ty = y0 + (h - txt.get_height()) // 2  # center vertically
-        self.window.blit(txt, (tx, ty))
+        self.window.blit(self._button_surface(r_win.size, alpha, label, font), r_win.topleft)
 
     def draw_card_context_menu(
             self, 
@@ -193,5 +223,12 @@ class OverlayRenderer:
             y = int((g.shop_origin.y + 3*g.card.y + 2*g.board_card_offset.h + 10) * sy)
             msg = "Discard required to receive gold if reserved"
 
-        text = self.small_font.render(msg, True, (255, 0, 0))
+        text = self._text_surface(self.small_font, msg, (255, 0, 0))
         self.window.blit(text, (x, y))
+
+    def draw_victory_banner(self, msg: str) -> None:
+        """Centered end-of-game message."""
+        if self.banner_font is None:
+            self.banner_font = pygame.font.SysFont(None, 72)
+        txt = self._text_surface(self.banner_font, msg, (255, 215, 0))
+        self.window.blit(txt, txt.get_rect(center=self.window.get_rect().center))
@@ -2,13 +2,10 @@
 
 import os
 import itertools as it
-from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
 
 
 # Global references
 gem_types = ['white', 'blue', 'green', 'red', 'black', 'gold']
-font = ImageFont.load_default()
 take_3_indices = list(it.combinations(range(5), 3))
 take_2_diff_indices = list(it.combinations(range(5), 2))
 
@@ -83,6 +80,8 @@ def move_to_text(move_idx: int, player):
 
 # Draw the game
 def render_board(game, image_save_path: str):
+    from PIL import Image, ImageDraw, ImageFont  # Only training renders need Pillow
+    font = ImageFont.load_default()
     board = game.board
     turn = game.half_turns
 
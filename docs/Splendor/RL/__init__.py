@@ -1,3 +1,8 @@
 # Splendor/RL/__init__.py
 
 from .inference_model import InferenceModel
+from .chance import ChanceModel
+from .transposition import TranspositionTable
+from .endgame import EndgameSolver
+from .search import MCTS, RootParallelSearch, SearchAgent, SearchResult, DIFFICULTY_TIERS
+from .heuristic_agent import HeuristicAgent
@@ -0,0 +1,75 @@
+# Splendor/RL/heuristic_agent.py
+"""Rule-based agent, cheap enough for rollouts and regression runs.
+
+In order of preference: buy the affordable card with the most points
+per gem spent, take the gems that cut the deficit to the most
+promising cards the most, and only when neither is possible reserve
+the most promising card.  Every rule is one broadcast over a batch of
+games, so a whole BatchedGame moves at once.  Ties are broken by a
+seeded generator, so a fixed seed replays the same games when the
+games are seeded too: BatchedGame.new(n, rng) or GUIGame(seed=...).
+The heuristic benchmark checks that two such runs agree.
+"""
+
+import numpy as np
+
+from Splendor.Environment.batched_game import (
+    BatchedGame, ACTION_TAKE, BUY_DIM, N_ACTIONS, TAKE_DIM
+)
+from Splendor.Environment.Splendor_components.Board_components.deck import CARD_COSTS, CARD_POINTS
+from Splendor.Environment.Splendor_components.Player_components.player import affordability
+
+
+class HeuristicAgent:
+    def __init__(self, seed: int | None = None, n_targets: int = 2):
+        """n_targets: how many cards the gem takes work towards."""
+        self.rng = np.random.default_rng(seed)
+        self.n_targets = n_targets
+
+    def select_move(self, game) -> int:
+        """Agent slot for GUIGame."""
+        if not isinstance(game, BatchedGame):
+            game = BatchedGame.from_game(game)
+        return int(self.select_moves(game)[0])
+
+    def select_moves(self, games: BatchedGame, legal: np.ndarray | None = None) -> np.ndarray:
+        """(N,) moves for the player to move in each game."""
+        if legal is None:
+            legal = games.legal_moves()
+        n = len(games)
+        idx = np.arange(n)
+        active = games.active
+        gems, cards = games.gems[idx, active], games.cards[idx, active]
+        ids = games.candidate_ids()
+        points = CARD_POINTS[ids]
+        noise = self.rng.random((n, N_ACTIONS)) * 1e-3  # Tie-breaks only
+
+        # Buy: points per gem spent, saving gold when we can
+        aff = affordability(CARD_COSTS[ids], gems, cards)
+        value = (points + 0.5) / (aff.spend.sum(axis=-1) + 1)
+        buy_scores = np.stack((value, value - 1e-2), axis=2).reshape(n, BUY_DIM)
+        buy = np.where(legal[:, TAKE_DIM:TAKE_DIM+BUY_DIM], buy_scores, -np.inf)
+
+        # Take: gems that close the deficit to the best target cards
+        deficit = np.maximum(CARD_COSTS[ids] - cards[:, None] - gems[:, None], 0)[..., :5]
+        promise = np.where(ids > 0, (points + 1) / (deficit.sum(axis=-1) + 1), -np.inf)
+        targets = np.argsort(-promise, axis=1, kind="stable")[:, :self.n_targets]
+        need = np.take_along_axis(deficit, targets[..., None], axis=1).sum(axis=1)
+        reduction = np.minimum(ACTION_TAKE[None, :, :5], need[:, None]).sum(axis=-1)
+        take = np.where(legal[:, :TAKE_DIM] & (reduction > 0), reduction, -np.inf)
+
+        # Reserve: most promising shop card, the deck tops last
+        reserve_scores = np.zeros((n, 3, 5))
+        reserve_scores[:, :, :4] = promise[:, :12].reshape(n, 3, 4)
+        reserve = np.where(legal[:, TAKE_DIM+BUY_DIM:], reserve_scores.reshape(n, -1), -np.inf)
+
+        # First rule with a candidate wins, anything legal as a fallback
+        scores = np.concatenate((take, buy, reserve), axis=1) + noise
+        fallback = np.where(legal, noise, -np.inf)
+        moves = np.argmax(fallback, axis=1)
+        for lo, hi in ((TAKE_DIM + BUY_DIM, N_ACTIONS), (0, TAKE_DIM), (TAKE_DIM, TAKE_DIM + BUY_DIM)):
+            rule = scores[:, lo:hi]
+            ok = np.isfinite(rule).any(axis=1)
+            moves[ok] = lo + np.argmax(rule[ok], axis=1)
+        return moves
+
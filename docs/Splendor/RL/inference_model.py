@@ -23,6 +23,12 @@ class InferenceModel:
         if not Ws:
             raise ValueError("No weights found in weights file")
 
+        # A trailing [hidden, 1] layer that reads the same input as
+        # the action head is a value head, not another dense layer
+        self.W_value = self.b_value = None
+        if len(Ws) > 2 and Ws[-1].shape == (Ws[-2].shape[0], 1):
+            self.W_value, self.b_value = Ws.pop(), bs.pop()
+
         self.W = Ws
         self.b = bs
         self.leaky = leaky_slope
@@ -32,22 +38,49 @@ class InferenceModel:
         self.layer_sizes = [w.shape[1] for w in self.W[:-1]]
         self.action_dim = self.W[-1].shape[1]
 
-    def _forward(self, state: np.ndarray) -> np.ndarray:
-        """Single-sample forward pass."""
+    @property
+    def has_value_head(self) -> bool:
+        return self.W_value is not None
+
+    def _hidden(self, state: np.ndarray) -> np.ndarray:
+        """Shared trunk; works on one state or a (B, state_dim) batch."""
         x = state.astype(np.float32)
 
         # Dense hidden layers with LeakyReLU(0.3)
         for i in range(len(self.W) - 1):
             x = x @ self.W[i] + self.b[i]
             x = np.where(x > 0, x, self.leaky * x)
+        return x
 
+    def _forward(self, state: np.ndarray) -> np.ndarray:
+        """Forward pass to q-values, single-sample or batched."""
         # Linear action head
-        x = x @ self.W[-1] + self.b[-1]
-        return x
+        return self._hidden(state) @ self.W[-1] + self.b[-1]
+
+    def get_values(self, states: np.ndarray) -> np.ndarray:
+        """State values for a (B, state_dim) batch in one pass,
+        from the perspective of the player to move in each state.
+        """
+        if self.W_value is None:
+            raise ValueError("Weights file has no value head")
+        x = self._hidden(states)
+        return (x @ self.W_value + self.b_value)[..., 0]
+
+    def evaluate(self, q_states: np.ndarray, value_states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """q-values for q_states and state values for value_states,
+        with one trunk pass over both batches.
+        """
+        if self.W_value is None:
+            raise ValueError("Weights file has no value head")
+        n = len(q_states)
+        x = self._hidden(np.concatenate((q_states, value_states)))
+        return x[:n] @ self.W[-1] + self.b[-1], (x[n:] @ self.W_value + self.b_value)[..., 0]
 
     def get_predictions(self, state: np.ndarray, legal_mask: np.ndarray) -> np.ndarray:
-        """Returns q-values"""
+        """Returns q-values (deterministic; no exploration)"""
         qs = self._forward(state)
+
+        # Set illegal moves' q to -inf
         qs = qs.astype(np.float32, copy=False)
         qs[~legal_mask] = -np.inf
         return qs
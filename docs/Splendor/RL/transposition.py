@@ -0,0 +1,88 @@
+# Splendor/RL/transposition.py
+"""Fixed-size transposition table for search.
+
+Positions are keyed by a 64-bit hash of their state encoding.  The
+network only sees the encoding, so positions reached by different move
+orders (the same gems taken over two turns in either order) share
+one entry and one evaluation.
+
+Each bucket holds two entries: a visit-preferred slot that is only
+replaced by an entry with at least as many visits, and an always-
+replace slot for everything else.  Memory use is fixed at creation.
+"""
+
+import numpy as np
+
+
+# Odd 64-bit multipliers, one per state component
+_MULTIPLIERS = np.random.default_rng(0x5B1E).integers(
+    1, 2**63, size=251, dtype=np.uint64
+) * np.uint64(2) + np.uint64(1)
+
+
+class TranspositionTable:
+    ENTRY_BYTES = 8 + 4 + 4 + 2  # key, value, visits, best move
+
+    def __init__(self, memory_mb: float = 16.0):
+        n_buckets = max(int(memory_mb * 2**20) // (2 * self.ENTRY_BYTES), 1)
+        n_buckets = 1 << (n_buckets.bit_length() - 1)  # Power of two for masking
+        self.mask = np.uint64(n_buckets - 1)
+
+        self.keys = np.zeros((n_buckets, 2), dtype=np.uint64)  # 0 marks empty
+        self.values = np.zeros((n_buckets, 2), dtype=np.float32)
+        self.visits = np.zeros((n_buckets, 2), dtype=np.int32)
+        self.best = np.full((n_buckets, 2), -1, dtype=np.int16)
+        self.probes = 0
+        self.hits = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.values.nbytes + self.visits.nbytes + self.best.nbytes
+
+    @staticmethod
+    def hash(states: np.ndarray) -> np.ndarray:
+        """(N,) uint64 keys for a (N, 251) float32 state batch."""
+        bits = np.ascontiguousarray(states, dtype=np.float32).view(np.uint32).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            h = (bits * _MULTIPLIERS).sum(axis=-1, dtype=np.uint64)
+            h ^= h >> np.uint64(31)
+            h *= np.uint64(0x9E3779B97F4A7C15)
+            h ^= h >> np.uint64(29)
+        return np.maximum(h, np.uint64(1))
+
+    def probe(self, keys: np.ndarray):
+        """Returns (hit, values, visits, best moves) per key."""
+        bucket = (keys & self.mask).astype(np.intp)
+        in_first = self.keys[bucket, 0] == keys
+        hit = in_first | (self.keys[bucket, 1] == keys)
+        slot = np.where(in_first, 0, 1)
+
+        self.probes += len(keys)
+        self.hits += int(hit.sum())
+        return hit, self.values[bucket, slot], self.visits[bucket, slot], self.best[bucket, slot]
+
+    def store(self, keys: np.ndarray, values, visits, best) -> None:
+        keys = np.asarray(keys, dtype=np.uint64)
+        values, visits, best = np.broadcast_arrays(values, visits, best, keys)[:3]
+        bucket = (keys & self.mask).astype(np.intp)
+
+        # Visit-preferred slot: same position, or at least as many visits
+        same = self.keys[bucket, 0] == keys
+        first = same | (visits >= self.visits[bucket, 0])
+
+        # The entry it displaces drops to the always-replace slot
+        demote = bucket[first & ~same & (self.keys[bucket, 0] != 0)]
+        for table in (self.keys, self.values, self.visits, self.best):
+            table[demote, 1] = table[demote, 0]
+
+        slot = np.where(first, 0, 1)
+        self.keys[bucket, slot] = keys
+        self.values[bucket, slot] = values
+        self.visits[bucket, slot] = visits
+        self.best[bucket, slot] = best
+
+    def clear(self) -> None:
+        self.keys[:] = 0
+        self.visits[:] = 0
+        self.best[:] = -1
+        self.probes = self.hits = 0
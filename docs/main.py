@@ -1,6 +1,6 @@
 # docs/main.py
 # /// script
-# dependencies = ["numpy", "pygame-ce", "Pillow"]
+# dependencies = ["numpy", "pygame-ce"]
 # ///
 
 import asyncio
@@ -27,7 +27,7 @@ try:
     from Splendor.Environment.Splendor_components.Player_components import HumanAgent
     from Splendor.Play.gui_pygame import SplendorGUI
     from Splendor.Play.render import BoardGeometry
-    from Splendor.RL import InferenceModel
+    from Splendor.RL import InferenceModel, SearchAgent, DIFFICULTY_TIERS
     log("[boot] game modules imported OK")
 except Exception:
     import traceback
@@ -43,10 +43,29 @@ def _resolve_model_path() -> str:
     return str(files("Splendor.RL.trained_agents") / "inference_model.npz")
 
 
-async def render_pause(ms, gui, clock):
+def _resolve_difficulty() -> str | None:
+    """Search tier from ?difficulty=<tier> or DIFFICULTY.  None
+    plays the network's moves directly, without search.
+    """
+    tier = os.getenv("DIFFICULTY")
+    try:
+        from urllib.parse import parse_qs
+        from js import window  # type: ignore
+        tier = parse_qs(str(window.location.search).lstrip("?")).get("difficulty", [tier])[0]
+    except Exception:
+        pass
+    if tier and tier not in DIFFICULTY_TIERS:
+        log(f"[boot] unknown difficulty {tier!r}, using the plain network")
+        return None
+    return tier or None
+
+
+async def render_pause(ms, gui, clock, game=None):
     end = pygame.time.get_ticks() + ms
     while pygame.time.get_ticks() < end:
         gui.tick()  # draw updated board
+        if game is not None:
+            game.think(gui.ponder_ms)  # The frame's one AI slice, tick() doesn't ponder while locked
         clock.tick(60)  # 60 FPS
         await asyncio.sleep(0)  # yield to the browser/event loop
 
@@ -64,8 +83,11 @@ async def main():
     model_path = _resolve_model_path()
     log(f"[boot] loading model: {model_path}")
     rl_agent = InferenceModel(model_path)
+    tier = _resolve_difficulty()
+    ai = rl_agent if tier is None else SearchAgent(rl_agent, tier=tier)  # Search ponders inside gui.tick
+    log(f"[boot] opponent: {tier or 'DDQN'}")
     human = HumanAgent()
-    players = [("DDQN", rl_agent, 0), ("Human", human, 1)]
+    players = [("DDQN", ai, 0), ("Human", human, 1)]
 
     game = GUIGame(players, rl_agent)
     gui = SplendorGUI(game, human)
@@ -85,7 +107,7 @@ async def main():
             # 3) advance game
             if human_move_ready:
                 game.turn()
-                await render_pause(gui.delay_after_move, gui, clock)
+                await render_pause(gui.delay_after_move, gui, clock, game)
             elif not human_turn:
                 game.turn()
 
@@ -95,8 +117,11 @@ async def main():
             running = False
 
         running &= bool(getattr(gui, "running", True))
-        clock.tick(60)
-        await asyncio.sleep(0)
+        if running and gui.idle and human_turn and not human_move_ready:
+            await asyncio.sleep(gui.idle_timeout_ms() / 1000)  # Nothing to draw or search
+        else:
+            clock.tick(60)
+            await asyncio.sleep(0)
 
     pygame.quit()
 
@@ -38,6 +38,12 @@ if WEIGHTS_SRC.exists():
 else:
     print("[stage] NOTE: weights not found, skipping", WEIGHTS_SRC)
 
+# Sprite atlas: pre-scaled pages instead of one full-size image per sprite
+sys.path.insert(0, str(ROOT))
+from Splendor.Play.render.atlas import build_atlas
+RESOURCES = DST / "Play" / "render" / "Resources"
+print("[stage] Wrote atlas", build_atlas(RESOURCES / "images", RESOURCES / "atlas"))
+
 # Build
 cmd = ["pygbag", "--PYBUILD", "3.12", str(APP / "main.py")]
 print("[build]", " ".join(cmd))